@@ -1,9 +1,14 @@
 """Shared Properties and methods across render_engine objects."""
 
+import typing
+from collections.abc import Mapping
+
 from slugify import slugify
 
 from .hookspecs import register_plugins
 
+_MISSING = object()
+
 
 class BaseObject:
     """
@@ -84,3 +89,86 @@ class BaseObject:
             self.plugins = plugins
 
         self._pm = register_plugins(self.plugins)
+
+
+class TemplateContext(Mapping):
+    """
+    A read-only view of an object's template variables.
+
+    Values are only computed when a template reads them, instead of copying
+    [`to_dict`][src.render_engine._base_object.BaseObject.to_dict] into a new dict for every render.
+    Keys resolve in the same order the rendered dict was merged in:
+
+    1. keyword arguments passed to the render
+    2. `content` (the object's parsed `_content`)
+    3. `template_vars`
+    4. `title`, `slug`, `url` and `path_name`
+    5. the object's attributes
+    6. the template's globals
+    """
+
+    _computed = {
+        "title": lambda obj: obj._title,
+        "slug": lambda obj: obj._slug,
+        "url": lambda obj: obj.url_for(),
+        "path_name": lambda obj: obj.path_name,
+    }
+
+    def __init__(self, obj: BaseObject, template_globals: Mapping | None = None, **kwargs: typing.Any) -> None:
+        self._obj = obj
+        self._globals = template_globals or {}
+        self._kwargs = kwargs
+
+    def _lookup(self, key: str) -> typing.Any:
+        if key in self._kwargs:
+            return self._kwargs[key]
+
+        if key == "content":
+            return self._obj._content
+
+        if key in (template_vars := getattr(self._obj, "template_vars", None) or {}):
+            return template_vars[key]
+
+        if key in self._computed:
+            return self._computed[key](self._obj)
+
+        if key in (attrs := vars(self._obj)):
+            return attrs[key]
+
+        return self._globals.get(key, _MISSING)
+
+    def __getitem__(self, key: str) -> typing.Any:
+        if (value := self._lookup(key)) is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return (
+            key in self._kwargs
+            or key == "content"
+            or key in (getattr(self._obj, "template_vars", None) or {})
+            or key in self._computed
+            or key in vars(self._obj)
+            or key in self._globals
+        )
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(
+            dict.fromkeys(
+                [
+                    *self._kwargs,
+                    "content",
+                    *(getattr(self._obj, "template_vars", None) or {}),
+                    *self._computed,
+                    *vars(self._obj),
+                    *self._globals,
+                ]
+            )
+        )
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def copy(self) -> dict[str, typing.Any]:
+        """Returns the variables as a dict. Jinja copies the context this way when it reports a template error"""
+        return dict(self)
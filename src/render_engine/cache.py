@@ -0,0 +1,257 @@
+"""Persistent caches used to avoid repeating work between builds."""
+
+# ruff: noqa: F821
+
+import functools
+import hashlib
+import importlib.metadata
+import inspect
+import json
+import logging
+import os
+import pathlib
+import pickle
+import typing
+
+from .parsers.base_parsers import BasePageParser
+
+CACHE_VERSION = b"1"
+DEFAULT_CACHE_PATH = ".render-engine"
+
+# the libraries the built-in parsers use, whose upgrades can change the parsed output
+PARSER_DISTRIBUTIONS = ("markdown2", "python-frontmatter")
+
+
+def _qualified_name(value: typing.Any) -> str:
+    return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', type(value).__qualname__)}"
+
+
+def _json_default(value: typing.Any) -> typing.Any:
+    """Serializes values that JSON doesn't support in a way that is stable between processes"""
+    if isinstance(value, set | frozenset):
+        return sorted(value, key=repr)
+
+    if isinstance(value, type) or callable(value) or type(value).__repr__ is object.__repr__:
+        # the default repr includes the memory address
+        return _qualified_name(value) if hasattr(value, "__qualname__") else _qualified_name(type(value))
+
+    return repr(value)
+
+
+def fingerprint(*parts: typing.Any) -> str:
+    """
+    Returns a stable hash of the given parts.
+
+    Classes are identified by their import path and everything else
+    that is not already `bytes` is serialized as sorted JSON (falling back to `repr`).
+    """
+    digest = hashlib.sha256(CACHE_VERSION)
+
+    for part in parts:
+        if isinstance(part, type):
+            part = _qualified_name(part)
+
+        if not isinstance(part, bytes):
+            part = json.dumps(part, sort_keys=True, default=_json_default).encode()
+
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+
+    return digest.hexdigest()
+
+
+def _distribution_version(name: str) -> str | None:
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+@functools.cache
+def parser_fingerprint(Parser: type) -> str:
+    """
+    Returns a hash of a parser's implementation.
+
+    This covers the source of every module the parser's classes are defined in
+    and the versions of the libraries the built-in parsers use, so editing a parser
+    or upgrading those libraries doesn't reuse content parsed by the old version.
+    """
+    sources = {}
+
+    for cls in inspect.getmro(Parser):
+        try:
+            source_file = inspect.getsourcefile(cls)
+        except TypeError:  # built-in classes like `object`
+            continue
+
+        if source_file and source_file not in sources:
+            try:
+                sources[source_file] = hashlib.sha256(pathlib.Path(source_file).read_bytes()).hexdigest()
+            except OSError:
+                sources[source_file] = None
+
+    return fingerprint(Parser, sources, {name: _distribution_version(name) for name in PARSER_DISTRIBUTIONS})
+
+
+class ParseCache:
+    """
+    On-disk cache of parsed page attributes and rendered content.
+
+    Entries are keyed by a hash of the source content, the parser (its class, the source of its
+    modules and the versions of the parsing libraries) and the page's `parser_extras`.
+    A modified file produces a new key, so entries never need to be invalidated.
+    Old entries are evicted, least recently used first, when the cache grows past `max_size`.
+
+    Entries used during a build are also kept in memory until the cache is pruned.
+    If `path` is `None` the cache only lives in memory.
+
+    !!! note
+        The cache assumes that a parser's output only depends on the content and `parser_extras`.
+
+    Attributes:
+        path: The directory the cache entries are stored in.
+        max_size: The maximum size of the cache in bytes.
+        hits: The number of lookups that were served from disk.
+        misses: The number of lookups that were not found on disk.
+    """
+
+    max_size: int = 512 * 1024 * 1024
+
+    def __init__(self, path: str | pathlib.Path | None = None, max_size: int | None = None) -> None:
+        self.path = pathlib.Path(path) if path else None
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+
+        if max_size is not None:
+            self.max_size = max_size
+
+    def _entry_path(self, key: str) -> pathlib.Path:
+        return self.path / key[:2] / key
+
+    def update(self, entries: dict[str, typing.Any]) -> None:
+        """Adds entries (like those parsed in another process) to the in-memory cache."""
+        self._entries.update(entries)
+
+    def get(self, key: str) -> typing.Any | None:
+        """Returns the cached value for `key` or `None` if it is not cached."""
+        if (value := self._entries.get(key)) is not None:
+            return value
+
+        if not self.path:
+            return None
+
+        entry = self._entry_path(key)
+
+        try:
+            with entry.open("rb") as f:
+                value = pickle.load(f)
+            os.utime(entry)  # keep track of use for eviction
+
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            logging.debug("Ignoring unreadable cache entry %s", entry)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries[key] = value
+        return value
+
+    def set(self, key: str, value: typing.Any) -> None:
+        """Stores `value` under `key`."""
+        self._entries[key] = value
+
+        if not self.path:
+            return None
+
+        entry = self._entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp_entry = entry.with_name(f"{entry.name}.{os.getpid()}.tmp")
+
+        try:
+            tmp_entry.write_bytes(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            os.replace(tmp_entry, entry)
+
+        except (OSError, pickle.PicklingError, TypeError, AttributeError):
+            logging.debug("Unable to cache entry %s", entry)
+            tmp_entry.unlink(missing_ok=True)
+
+    def prune(self) -> int:
+        """
+        Evicts the least recently used entries until the cache fits in `max_size`.
+
+        This also releases the entries that are kept in memory.
+        Returns the number of entries that were removed.
+        """
+        self._entries = {}
+
+        if not self.path or not self.path.exists():
+            return 0
+
+        entries = []
+
+        for entry in self.path.glob("*/*"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        total_size = sum(size for _, size, _ in entries)
+        removed = 0
+
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total_size <= self.max_size:
+                break
+
+            entry.unlink(missing_ok=True)
+            total_size -= size
+            removed += 1
+
+        return removed
+
+    def parse_content_path(
+        self,
+        Parser: type[BasePageParser],
+        content_path: str | pathlib.Path,
+    ) -> tuple[dict, str]:
+        """
+        Returns the attributes and content for `content_path` using `Parser.parse_content_path`.
+
+        Only local files are cached. Other content paths (like urls) are always parsed.
+        """
+        path = pathlib.Path(content_path)
+
+        if not path.is_file():
+            return Parser.parse_content_path(content_path)
+
+        key = fingerprint("attrs", parser_fingerprint(Parser), path.read_bytes())
+
+        if (cached := self.get(key)) is not None:
+            return cached
+
+        attrs, content = Parser.parse_content_path(content_path)
+        self.set(key, (dict(attrs), content))
+        return attrs, content
+
+    def parse(self, Parser: type[BasePageParser], content: typing.Any, page: "Page" = None) -> typing.Any:
+        """Returns the result of `Parser.parse` for `content`."""
+
+        if not isinstance(content, str):
+            return Parser.parse(content, page=page)
+
+        key = fingerprint("html", parser_fingerprint(Parser), getattr(page, "parser_extras", None) or {}, content)
+
+        if (cached := self.get(key)) is not None:
+            return cached
+
+        markup = Parser.parse(content, page=page)
+
+        if markup is not None:
+            self.set(key, markup)
+
+        return markup
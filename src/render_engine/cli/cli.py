@@ -6,12 +6,16 @@ import sys
 import typing
 from typing import Annotated
 
+import git
 import typer
 from rich.console import Console
 from rich.progress import Progress
 
-from render_engine.cli.event import RegExHandler
+from render_engine.cache import DEFAULT_CACHE_PATH
+from render_engine.cli.event import OnDemandRenderer, RegExHandler, spawn_on_demand_server
+from render_engine.collection import Collection
 from render_engine.engine import engine
+from render_engine.manifest import ChangeSet
 from render_engine.site import Site
 
 app = typer.Typer()
@@ -266,18 +270,106 @@ def init(
             progress.update(task_create_collection, advance=1)
 
 
+def _set_cache_path(app: Site, cache: bool, cache_path: pathlib.Path | None) -> None:
+    """Uses `cache_path` (or the default path) unless caching is turned off or the site sets its own path"""
+    if not cache:
+        app.cache_path = None
+    elif cache_path or not app.cache_path:
+        app.cache_path = cache_path or DEFAULT_CACHE_PATH
+
+
+CachePathOption = Annotated[
+    typing.Optional[pathlib.Path],
+    typer.Option(
+        "--cache-path",
+        help=f"Directory for build caches. Defaults to the site's `cache_path` or `{DEFAULT_CACHE_PATH}`",
+        show_default=False,
+    ),
+]
+CacheOption = Annotated[
+    bool,
+    typer.Option(
+        "--cache/--no-cache",
+        help="Cache parsed content and compiled templates between builds",
+    ),
+]
+
+
 @app.command()
-def build(module_site: Annotated[str, typer.Argument(callback=split_module_site)]):
+def build(
+    module_site: Annotated[str, typer.Argument(callback=split_module_site)],
+    cache: CacheOption = True,
+    cache_path: CachePathOption = None,
+    jobs: Annotated[
+        typing.Optional[int],
+        typer.Option(
+            "--jobs",
+            "-j",
+            help="Number of processes used to parse and render the site",
+            show_default=False,
+        ),
+    ] = None,
+    since: Annotated[
+        typing.Optional[str],
+        typer.Option(
+            "--since",
+            help="Only render the outputs affected by the files changed between this git revision and HEAD",
+            show_default=False,
+        ),
+    ] = None,
+):
     """
     CLI for creating a new site
 
     Params:
         site_module: module and class name of the site
+        cache: cache parsed content and compiled templates between builds
+        cache_path: directory for the build caches
+        jobs: number of processes used to render the site and to parse collections that don't set `parse_workers`
+        since: git revision (like the last deployed commit) to compare with HEAD for a partial build
 
     """
     module, site = module_site
     app = get_app(module, site)
-    app.render()
+    _set_cache_path(app, cache, cache_path)
+    changes = None
+
+    if since:
+        try:
+            changes = ChangeSet.from_git(since)
+        except (git.GitError, git.BadName, ValueError) as e:
+            raise typer.BadParameter(f"Unable to compare {since} with HEAD: {e}", param_hint="--since")
+
+    if jobs:
+        app.render_workers = jobs
+
+        for entry in app.route_list.values():
+            if isinstance(entry, Collection) and not entry.parse_workers:
+                entry.parse_workers = jobs
+
+    app.render(changes=changes)
+
+
+@app.command()
+def compile_templates(
+    module_site: Annotated[str, typer.Argument(callback=split_module_site)],
+    cache_path: CachePathOption = None,
+):
+    """
+    Compile the site's templates (including theme templates) ahead of a build.
+
+    The compiled templates are stored in the cache path, which can be restored in CI
+    so that cold builds skip compiling templates.
+
+    Params:
+        module_site: module and class name of the site
+        cache_path: directory for the build caches
+    """
+    module, site = module_site
+    app = get_app(module, site)
+    _set_cache_path(app, True, cache_path)
+    compiled = app.compile_templates()
+    Console().print(f"[green]Compiled {compiled} templates into [blue]{pathlib.Path(app.cache_path) / 'jinja'}")
 
 
 @app.command()
@@ -292,32 +384,50 @@ def serve(
     reload: Annotated[
         bool,
         typer.Option(
-            None,
             "--reload",
             "-r",
             help="Reload the server when files change",
         ),
-    ],
+    ] = False,
     directory: Annotated[
-        str,
+        typing.Optional[str],
         typer.Option(
-            None,
             "--directory",
             "-d",
             help="Directory to serve",
             show_default=False,
         ),
-    ],
+    ] = None,
     port: Annotated[
         int,
         typer.Option(
-            8000,
             "--port",
             "-p",
             help="Port to serve on",
             show_default=False,
         ),
-    ],
+    ] = 8000,
+    quiet_window: Annotated[
+        float,
+        typer.Option(
+            "--quiet-window",
+            help="Seconds without file changes to wait for before rebuilding",
+        ),
+    ] = 0.3,
+    on_demand: Annotated[
+        bool,
+        typer.Option(
+            "--on-demand",
+            help="Render pages when they are requested instead of building the site first",
+        ),
+    ] = False,
+    cache_size: Annotated[
+        int,
+        typer.Option(
+            "--cache-size",
+            help="Number of rendered pages to keep in memory (with `--on-demand`)",
+        ),
+    ] = 128,
 ):
     """
     Create an HTTP server to serve the site at `localhost`.
@@ -331,12 +441,21 @@ def serve(
         build: flag to build the site prior to serving the app
         directory: Directory to serve. If `module_site` is provided, this will be the `output_path` of the site.
         port: Port to serve on
+        quiet_window: Seconds without file changes to wait for before rebuilding (with `--reload`)
+        on_demand: Render the requested pages in memory instead of building the site to `output_path`
+        cache_size: Number of rendered pages to keep in memory (with `--on-demand`)
     """
 
+    renderer = None
+
     if module_site:
         module, site = module_site
         app = get_app(module, site)
-        app.render()
+
+        if on_demand:
+            renderer = OnDemandRenderer(app, cache_size=cache_size)
+        else:
+            app.render()
 
     if not directory:
         if module_site:
@@ -352,14 +471,20 @@ def serve(
         app=app,
         module_site=module_site,
         patterns=None,
-        ignore_patterns=[r".*output\\*.+$", r"\.\\\..+$", r".*__.*+$"],
+        # caches, hidden files and editor swap files (on any platform)
+        ignore_patterns=[r".*[/\\]__pycache__[/\\].*", r".*[/\\]\.[^/\\]+$", r".*~$", r".*\.(swp|swx|tmp)$"],
+        quiet_window=quiet_window,
+        renderer=renderer,
     )
 
     console = Console()
 
     if not reload:
         console.print(f"[bold green]Starting server on http://{server_address[0]}:{server_address[1]}[/bold green]")
-        handler._server(server_address=server_address, directory=directory).serve_forever()
+        if renderer:
+            spawn_on_demand_server(server_address, renderer).serve_forever()
+        else:
+            handler._server(server_address=server_address, directory=directory).serve_forever()
     else:
         console.print("Watching for changes...")
         handler.watch()
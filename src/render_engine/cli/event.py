@@ -1,16 +1,32 @@
 import importlib
+import io
+import logging
+import pathlib
+import sys
 import threading
 import time
+import typing
+import urllib.parse
+from collections import OrderedDict
+from http import HTTPStatus
 from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 
+import watchdog.events
 from rich.console import Console
-from watchdog.events import FileSystemEvent, RegexMatchingEventHandler
+from watchdog.events import EVENT_TYPE_OPENED, FileSystemEvent, RegexMatchingEventHandler
 from watchdog.observers import Observer
 
 from render_engine import Site
+from render_engine.collection import Collection
+from render_engine.engine import loader_paths
+from render_engine.manifest import BuildManifest
+from render_engine.page import Page
 
 console = Console()
 
+# reading a file is not a change (watchdog < 5 doesn't report closing a file that wasn't written)
+IGNORED_EVENT_TYPES = {EVENT_TYPE_OPENED, getattr(watchdog.events, "EVENT_TYPE_CLOSED_NO_WRITE", "closed_no_write")}
+
 
 def spawn_server(server_address: tuple[str, int], directory: str) -> ThreadingHTTPServer:
     """
@@ -33,24 +49,273 @@ def spawn_server(server_address: tuple[str, int], directory: str) -> ThreadingHT
     return _httpd()
 
 
+class OnDemandRenderer:
+    """
+    Renders the outputs of a site when they are requested instead of rendering the whole site ahead of time.
+
+    Request paths are resolved against the site's routes and only the requested page, archive or feed
+    is rendered. Nothing is written to the `output_path`: rendered responses are kept in memory, in a cache
+    of the `cache_size` most recently requested outputs. Static files are read straight from the `static_paths`.
+
+    The pre-build and post-build plugins are not run, so outputs written by the post-build
+    plugins (like the sitemap) are not available.
+
+    Params:
+        app: A Site instance
+        cache_size: The number of rendered responses to keep in memory
+    """
+
+    def __init__(self, app: Site, cache_size: int = 128) -> None:
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self.load(app)
+
+    def load(self, app: Site) -> None:
+        """Reads the routes of the site (without rendering them) and drops the rendered responses"""
+        with self._lock:
+            self.app = app
+            # the pre-build plugins aren't run, they prepare the output path (like `CleanOutput` removing it)
+            app._prepare_render()
+
+            if app.fingerprint_static:
+                app._asset_hashes = getattr(app, "_asset_hashes", None) or BuildManifest("")
+                app.engine.globals["assets"] = app._fingerprint_static(app._asset_hashes)
+            else:
+                app.engine.globals["assets"] = {}
+
+            self._outputs = app._output_routes()
+            self._fingerprinted = {fingerprinted: path for path, fingerprinted in app.engine.globals["assets"].items()}
+            self._responses: OrderedDict[str, str] = OrderedDict()
+
+    def reload(self, changes: set[str]) -> None:
+        """Parses the changed content again. The collections' pages are generated again when the routes are read"""
+        changed = {pathlib.Path(path).resolve() for path in changes}
+
+        for entry in self.app.route_list.values():
+            content_path = getattr(entry, "content_path", None)
+
+            if (
+                isinstance(entry, Page)
+                and isinstance(content_path, str | pathlib.Path)
+                and pathlib.Path(content_path).resolve() in changed
+                and pathlib.Path(content_path).exists()
+            ):
+                entry._reload_content()
+
+        self.load(self.app)
+
+    @staticmethod
+    def _output_name(request_path: str) -> str | None:
+        """Returns the requested path relative to the output path (`None` if it leaves the output path)"""
+        path = urllib.parse.unquote(urllib.parse.urlsplit(request_path).path)
+        parts = [part for part in path.split("/") if part and part != "."]
+
+        if ".." in parts:
+            return None
+
+        if not parts or path.endswith("/"):
+            parts.append("index.html")
+
+        return "/".join(parts)
+
+    def static_file(self, request_path: str) -> pathlib.Path | None:
+        """Returns the static file served at the request path, if there is one"""
+        if (name := self._output_name(request_path)) is None:
+            return None
+
+        name = self._fingerprinted.get(name, name)
+        directory, _, relative = name.partition("/")
+
+        for static_path in sorted(self.app.static_paths, key=str):
+            # static files are copied to a folder named like their static path, like `_render_static` does
+            if pathlib.Path(static_path).name == directory and (path := pathlib.Path(static_path, relative)).is_file():
+                return path
+
+        return None
+
+    def render(self, request_path: str) -> tuple[str, str] | None:
+        """Returns the output name and the rendered content of the request path (`None` if no page is routed there)"""
+        if (name := self._output_name(request_path)) is None:
+            return None
+
+        if name not in self._outputs and f"{name}/index.html" in self._outputs:
+            name = f"{name}/index.html"
+
+        with self._lock:
+            if (content := self._responses.get(name)) is not None:
+                self._responses.move_to_end(name)
+                return name, content
+
+            if (job := self._outputs.get(name)) is None:
+                return None
+
+            content = self._responses[name] = self.app._render_in_memory(*job)
+
+            while len(self._responses) > self.cache_size:
+                self._responses.popitem(last=False)
+
+        return name, content
+
+
+def spawn_on_demand_server(server_address: tuple[str, int], renderer: OnDemandRenderer) -> ThreadingHTTPServer:
+    """
+    Create and return an instance of ThreadingHTTPServer that renders the site's pages when they are requested.
+
+    Params:
+            server_address: A tuple of a string and integer representing the server address (host, port).
+            renderer: The OnDemandRenderer that renders the requested pages.
+    """
+
+    class _RequestHandler(SimpleHTTPRequestHandler):
+        def send_head(self):
+            if (response := renderer.render(self.path)) is None:
+                return super().send_head()
+
+            name, content = response
+            body = content.encode()
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-type", self.guess_type(name))
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            return io.BytesIO(body)
+
+        def translate_path(self, path: str) -> str:
+            # anything that isn't a static file doesn't exist
+            return str(renderer.static_file(path) or "")
+
+    return ThreadingHTTPServer(server_address, _RequestHandler)
+
+
+def site_paths(app: Site, module_path: str | None = None) -> tuple[list[pathlib.Path], list[pathlib.Path]]:
+    """
+    Returns the directories and the files the site is generated from.
+
+    The directories are the collections' `content_path`s, the template directories (including the themes' loaders)
+    and the `static_paths`. The files are the pages' `content_path`s and the site's module (`module_path`).
+    Nothing inside the site's `output_path` is returned.
+    """
+    output_path = pathlib.Path(app.output_path).resolve()
+    directories = loader_paths(app.engine.loader)
+    directories.extend(pathlib.Path(path) for path in app.static_paths)
+    files = [pathlib.Path(module_path)] if module_path else []
+
+    for entry in app.route_list.values():
+        if not (content_path := getattr(entry, "content_path", None)) or not isinstance(
+            content_path, str | pathlib.Path
+        ):
+            continue
+
+        (directories if isinstance(entry, Collection) else files).append(pathlib.Path(content_path))
+
+    def _keep(path: pathlib.Path) -> bool:
+        return path.exists() and not path.resolve().is_relative_to(output_path)
+
+    directories = sorted({path.resolve() for path in directories if _keep(path) and path.is_dir()}, key=str)
+    # nested directories are already watched through their parent
+    directories = [
+        path for path in directories if not any(path != other and path.is_relative_to(other) for other in directories)
+    ]
+    files = sorted(
+        {
+            path.resolve()
+            for path in files
+            if _keep(path) and not any(path.resolve().is_relative_to(directory) for directory in directories)
+        },
+        key=str,
+    )
+    return directories, files
+
+
+class RebuildWorker:
+    """
+    Runs rebuilds on a single background thread.
+
+    Changes are collected until no change arrived for `quiet_window` seconds, so the bursts of events
+    fired by saving a file trigger a single rebuild. Changes that arrive while a rebuild is running
+    are collapsed into the next rebuild.
+
+    Params:
+        rebuild: Called with the paths that changed
+        quiet_window: The number of seconds without changes to wait for before rebuilding
+    """
+
+    def __init__(self, rebuild: typing.Callable[[set[str]], None], quiet_window: float = 0.3) -> None:
+        self.rebuild = rebuild
+        self.quiet_window = quiet_window
+        self._pending: set[str] = set()
+        self._last_change = 0.0
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def request(self, path: str) -> None:
+        """Adds a changed path to the next rebuild"""
+        with self._condition:
+            self._pending.add(path)
+            self._last_change = time.monotonic()
+            self._condition.notify()
+
+    def _next_changes(self) -> set[str] | None:
+        """Waits for changes followed by the quiet window and returns them (`None` once stopped)"""
+        with self._condition:
+            while not self._pending and not self._stopped:
+                self._condition.wait()
+
+            while not self._stopped and (remaining := self._last_change + self.quiet_window - time.monotonic()) > 0:
+                self._condition.wait(remaining)
+
+            if self._stopped:
+                return None
+
+            changes, self._pending = self._pending, set()
+            return changes
+
+    def _run(self) -> None:
+        while (changes := self._next_changes()) is not None:
+            try:
+                self.rebuild(changes)
+            except Exception:
+                logging.exception("Unable to rebuild the site")
+
+
 class RegExHandler(RegexMatchingEventHandler):
     """
-    Initializes a handler that looks for file changes in a directory (`dir_to_watch`), as
+    Initializes a handler that looks for changes to the files the site is generated from, as
     well as creates a server to serve files in a given directory (`dir_to_serve`). The
     class contains helper methods to manage server events in a thread.
 
     Meanwhile, the `watch` method uses an instance of this handler class to monitor for file
-    changes. The files to be monitored are all files/directories within the `dir_to_watch`,
-    which defaults to the project root directory. The `patterns` and `ignore_patterns` are used
-    to filter the files to be monitored using regular expressions.
+    changes. Only the site's content paths, template directories, theme loaders, static paths and
+    module are watched (or `dir_to_watch`, if it is set). Changes inside the site's `output_path`
+    are always ignored. The `patterns` and `ignore_patterns` are used to filter the files to be
+    monitored using regular expressions.
+
+    Changes are coalesced: the site is rebuilt on a background thread once no change arrived
+    for `quiet_window` seconds.
+
+    With a `renderer`, pages are rendered when they are requested instead of being served from
+    `dir_to_serve`, and changes only drop the rendered responses.
 
     Params:
         server_address: A tuple of the form (host, port)
         dir_to_serve: The directory to serve
         app: A Site instance
-        dir_to_watch: The directory to watch
+        dir_to_watch: The directory to watch instead of the site's paths
         patterns: A list of regular expressions to filter files
         ignore_patterns: A list of regular expressions to ignore
+        quiet_window: The number of seconds without changes to wait for before rebuilding
+        renderer: An OnDemandRenderer that renders the requested pages
     """
 
     def __init__(
@@ -59,9 +324,11 @@ class RegExHandler(RegexMatchingEventHandler):
         dir_to_serve: str,
         app: Site,
         module_site: str,
-        dir_to_watch: str = ".",
+        dir_to_watch: str | None = None,
         patterns: [list[str] | None] = None,
         ignore_patterns: [list[str] | None] = None,
+        quiet_window: float = 0.3,
+        renderer: OnDemandRenderer | None = None,
         *args,
         **kwargs,
     ):
@@ -74,13 +341,46 @@ class RegExHandler(RegexMatchingEventHandler):
         self.dir_to_watch = dir_to_watch
         self.patterns = patterns
         self.ignore_patterns = ignore_patterns
+        self.quiet_window = quiet_window
+        self.renderer = renderer
+        self._rebuilds = RebuildWorker(self.rebuild, quiet_window)
         super().__init__(*args, regexes=patterns, ignore_regexes=ignore_patterns, **kwargs)
+        self._update_watched_paths()
+
+    def _module_path(self) -> str | None:
+        if not self.module_site:
+            return None
+
+        return getattr(sys.modules.get(self.module_site[0]), "__file__", None)
+
+    def _update_watched_paths(self) -> None:
+        """Finds the paths to watch (the site's paths can change when it is rebuilt)"""
+        self._output_path = pathlib.Path(self.app.output_path).resolve()
+
+        if self.dir_to_watch:
+            self.watched_directories, self.watched_files = [pathlib.Path(self.dir_to_watch).resolve()], []
+        else:
+            self.watched_directories, self.watched_files = site_paths(self.app, self._module_path())
+
+    def is_watched(self, path: str) -> bool:
+        """Returns True if changes to `path` should rebuild the site"""
+        path = pathlib.Path(path).resolve()
+
+        if path.is_relative_to(self._output_path):
+            return False
+
+        return path in self.watched_files or any(
+            path.is_relative_to(directory) for directory in self.watched_directories
+        )
 
     def start_server(self):
         console.print(
             f"[bold green]Spawning server on http://{self.server_address[0]}:{self.server_address[1]}[/bold green]"
         )
-        self._server = spawn_server(self.server_address, self.dir_to_serve[0])
+        if self.renderer:
+            self._server = spawn_on_demand_server(self.server_address, self.renderer)
+        else:
+            self._server = spawn_server(self.server_address, self.dir_to_serve[0])
         self._thread = threading.Thread(target=self._server.serve_forever)
         self._thread.start()
 
@@ -89,36 +389,82 @@ class RegExHandler(RegexMatchingEventHandler):
         self._server.shutdown()
         self._thread.join()
 
-    def rebuild(self):
-        console.print("[bold purple]Reloading and Rebuilding site...[/bold purple]")
-        import_path = self.module_site[0]
-        module = importlib.import_module(import_path)
-        importlib.reload(module)
-        self.app.render()
+    def rebuild(self, changes: set[str] | None = None):
+        """
+        Regenerates the outputs affected by the changed paths.
+
+        The site and its pages stay in memory and only the affected outputs are rendered
+        (see [`Site.rebuild`][src.render_engine.site.Site.rebuild]). The site's module is only
+        reloaded (and the whole site rendered) when the module itself changed.
+
+        With a `renderer` nothing is rendered: the changed content is parsed again and the rendered
+        responses are dropped, so pages are rendered again when they are requested.
+        """
+        module_path = self._module_path()
+
+        if changes is None or (
+            module_path and pathlib.Path(module_path).resolve() in {pathlib.Path(path).resolve() for path in changes}
+        ):
+            console.print("[bold purple]Reloading and Rebuilding site...[/bold purple]")
+            import_path, app_name = self.module_site
+            module = importlib.reload(importlib.import_module(import_path))
+            self.app = getattr(module, app_name)
+
+            if self.renderer:
+                self.renderer.load(self.app)
+            else:
+                self.app.render()
+
+            self._update_watched_paths()
+            return
+
+        if self.renderer:
+            self.renderer.reload(changes)
+            console.print("[bold purple]Reloaded the changed pages[/bold purple]")
+            return
+
+        start = time.perf_counter()
+        rendered = self.app.rebuild(changes)
+        console.print(
+            f"[bold purple]Rebuilt {rendered} pages in {(time.perf_counter() - start) * 1000:.0f} ms[/bold purple]"
+        )
 
     def on_any_event(self, event: FileSystemEvent):
-        if event.is_directory:
+        if event.is_directory or event.event_type in IGNORED_EVENT_TYPES:
             return None
-        self.rebuild()
+
+        for path in (event.src_path, getattr(event, "dest_path", "")):
+            if path and self.is_watched(path):
+                self._rebuilds.request(path)
+
+    def _schedule(self, observer: Observer) -> None:
+        """Watches the site's directories and the directories of the site's files"""
+        for directory in self.watched_directories:
+            observer.schedule(self, str(directory), recursive=True)
+
+        for directory in sorted({path.parent for path in self.watched_files}, key=str):
+            if not any(directory.is_relative_to(watched) for watched in self.watched_directories):
+                observer.schedule(self, str(directory), recursive=False)
 
     def watch(self):
         """
         This function `watch` starts the server on the output path (`dir_to_serve`)
-        and monitors the specified directory (`dir_to_watch`) for changes.
+        and monitors the site's paths (or `dir_to_watch`) for changes.
 
-        After it starts the server, it "waits" and monitors the directory for
-        changes. If a change is detected, the `on_any_event` method is called,
-        which will stop the server and rebuild the site before restarting the
-        server.
+        After it starts the server, it "waits" and monitors the paths for
+        changes. If a change is detected, the `on_any_event` method hands it to a
+        background worker that regenerates the affected outputs once the changes settle.
 
         If a KeyboardInterrupt is raised, it stops the observer and server.
         """
 
-        console.print(f"[yellow]Serving {self.app.output_path}[/yellow]")
+        if not self.renderer:
+            console.print(f"[yellow]Serving {self.app.output_path}[/yellow]")
 
         observer = Observer()
-        observer.schedule(self, self.dir_to_watch, recursive=True)
+        self._schedule(observer)
         self.start_server()
+        self._rebuilds.start()
         observer.start()
 
         try:
@@ -127,6 +473,7 @@ class RegExHandler(RegexMatchingEventHandler):
         except KeyboardInterrupt:
             console.print("watcher terminated by keystroke")
             observer.stop()
+            self._rebuilds.stop()
             self.stop_server()
         observer.join()
         console.print("[bold red]FIN![/bold red]")
@@ -1,17 +1,19 @@
+import heapq
 import logging
 import pathlib
 import typing
 
-import git
 from more_itertools import batched, flatten
 from slugify import slugify
 
 from ._base_object import BaseObject
 from .archive import Archive
+from .cache import ParseCache
 from .feeds import RSSFeed
 from .page import Page
 from .parsers import BasePageParser
 from .parsers.markdown import MarkdownPageParser
+from .utils.workers import run_in_workers
 
 
 class Collection(BaseObject):
@@ -42,9 +44,13 @@ class Collection(BaseObject):
         content_type: Type[Page] = Page
         Feed: Type[RSSFeed]
         feed_title: str
+        feed_max_items: int | None: The number of pages in the feed, selected in the collection's sort order
+            (the newest pages of a `Blog`). Every page is in the feed if not set.
         include_suffixes: list[str] = ["*.md", "*.html"]
         items_per_page: int | None
         PageParser: Type[BasePageParser] = MarkdownPageParser
+        parse_cache: ParseCache | None
+        parse_workers: int | None: The number of processes used to parse pages. Parsed serially if not set.
         parser_extras: dict[str, Any]
         required_themes: list[callable]
         routes: list[str] = ["./"]
@@ -62,9 +68,12 @@ class Collection(BaseObject):
     content_type: Page = Page
     Feed: RSSFeed
     feed_title: str
+    feed_max_items: int | None = None
     include_suffixes: list[str] = ["*.md", "*.html"]
     items_per_page: int | None
     PageParser: BasePageParser = MarkdownPageParser
+    parse_cache: ParseCache | None = None
+    parse_workers: int | None = None
     parser_extras: dict[str, any]
     required_themes: list[typing.Callable]
     routes: list[str] = ["./"]
@@ -86,33 +95,16 @@ class Collection(BaseObject):
 
         return flatten([pathlib.Path(self.content_path).glob(suffix) for suffix in self.include_suffixes])
 
-    def _generate_content_from_modified_pages(self) -> typing.Generator[Page, None, None]:
-        """
-        Check git status for newly created and modified files.
-        Returns the Page objects for the files in the content path
-        """
-
-        repo = git.Repo()
-
-        changed_files = [
-            *repo.untracked_files,  # new files not yet in git's index
-            *repo.index.diff(),  # modified files in git index
-        ]
-
-        return (
-            self.get_page(pathlib.Path(changed_path))
-            for changed_path in changed_files
-            if pathlib.Path(changed_path).parent == pathlib.Path(self.content_path)
-        )
-
     def get_page(
         self,
         content_path: str | None = None,
     ) -> type[Page]:
         """Returns the page Object for the specified Content Path"""
+        page_kwargs = {"parse_cache": self.parse_cache} if self.parse_cache else {}
         _page = self.content_type(
             content_path=content_path,
             Parser=self.PageParser,
+            **page_kwargs,
         )
 
         if getattr(self, "_pm", None):
@@ -169,7 +161,17 @@ class Collection(BaseObject):
     @property
     def feed(self):
         feed = self.Feed()
-        feed.pages = [page for page in self]
+
+        if self.feed_max_items is None:
+            feed.pages = [page for page in self]
+        else:
+            # the first pages in sort order, without sorting the whole collection
+            select = heapq.nlargest if self.sort_reverse else heapq.nsmallest
+            feed.pages = select(self.feed_max_items, self, key=lambda page: getattr(page, self.sort_by, self._title))
+
+        if self.parse_cache:
+            feed._parse_cache = self.parse_cache
+
         feed.title = getattr(self, "feed_title", self._title)
         feed.slug = self._slug
         feed.Parser = self.PageParser
@@ -185,13 +187,74 @@ class Collection(BaseObject):
     def __str__(self):
         return f"{__class__.__name__}"
 
+    def load_pages(self) -> list[Page]:
+        """
+        Returns the pages generated from the `content_path`.
+
+        The pages are only generated the first time this is called.
+        Every other consumer (archives, feeds, filters) reuses the same page objects
+        until [`invalidate_pages`][src.render_engine.collection.Collection.invalidate_pages] is called.
+        """
+        if (pages := getattr(self, "_loaded_pages", None)) is None:
+            content_paths = list(self.iter_content_path())
+
+            if self.parse_workers and self.parse_workers > 1:
+                pages = self._load_pages_in_workers(content_paths)
+            else:
+                pages = [self.get_page(content_path) for content_path in content_paths]
+
+            self._loaded_pages = pages
+
+        return pages
+
+    def _load_pages_in_workers(self, content_paths: list[pathlib.Path]) -> list[Page]:
+        """
+        Parses the content paths in `parse_workers` processes.
+
+        The workers fill a parse cache that the pages are then created from,
+        so the pages and their order are the same as a serial load.
+        """
+        parse_cache = self.parse_cache or ParseCache()
+        self.parse_cache, default_parse_cache = parse_cache, self.parse_cache
+
+        try:
+            for entries, hits, misses in run_in_workers(
+                _parse_page,
+                (self, content_paths),
+                len(content_paths),
+                self.parse_workers,
+            ):
+                parse_cache.update(entries)
+                parse_cache.hits += hits
+                parse_cache.misses += misses
+
+            hits, misses = parse_cache.hits, parse_cache.misses
+            pages = [self.get_page(content_path) for content_path in content_paths]
+            parse_cache.hits, parse_cache.misses = hits, misses
+
+        finally:
+            self.parse_cache = default_parse_cache
+
+        return pages
+
+    def invalidate_pages(self) -> None:
+        """Drops the loaded pages so that they are generated again on the next iteration."""
+        self._loaded_pages = None
+
     def __iter__(self):
         if not hasattr(self, "pages"):
-            for page in self.iter_content_path():
-                yield self.get_page(page)
+            yield from self.load_pages()
         else:
-            for page in self.pages:
-                yield page
+            yield from self.pages
+
+
+def _parse_page(state: tuple[Collection, list[pathlib.Path]], index: int) -> tuple[dict, int, int]:
+    """Parses a single content path in a worker and returns the new parse cache entries and counts"""
+    collection, content_paths = state
+    parse_cache = collection.parse_cache
+    parse_cache._entries, parse_cache.hits, parse_cache.misses = {}, 0, 0
+    collection.get_page(content_paths[index])._content
+    return parse_cache._entries, parse_cache.hits, parse_cache.misses
 
 
 def render_archives(archive, **kwargs) -> list[Archive]:
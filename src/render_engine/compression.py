@@ -0,0 +1,80 @@
+"""Pre-compressed copies of the outputs for servers that serve `.gz` and `.br` files directly."""
+
+import gzip
+import hashlib
+import logging
+import os
+import pathlib
+import typing
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+COMPRESSIBLE_SUFFIXES = {".html", ".xml", ".rss", ".atom", ".css", ".js", ".json", ".txt", ".svg"}
+
+
+def _gzip(content: bytes) -> bytes:
+    # no timestamp, so the same content always compresses to the same bytes
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def _brotli(content: bytes) -> bytes:
+    return brotli.compress(content, quality=11)
+
+
+def encoders() -> dict[str, typing.Callable[[bytes], bytes]]:
+    """Returns the compression function of each available encoding, keyed by its file suffix"""
+    encoders = {".gz": _gzip}
+
+    if brotli:
+        encoders[".br"] = _brotli
+
+    return encoders
+
+
+def is_compressible(path: str | pathlib.Path) -> bool:
+    """Returns True if the file is a text format worth compressing"""
+    return pathlib.Path(path).suffix in COMPRESSIBLE_SUFFIXES
+
+
+def compress_file(path: str | pathlib.Path, digest: str | None = None) -> tuple[str, str | None, bool]:
+    """
+    Writes the compressed copies of `path` next to it (`index.html.gz`, `index.html.br`).
+
+    If the content of `path` still has the hash `digest` and the copies exist, nothing is written.
+    Returns the path, the hash of its content (or `None` if it couldn't be read) and whether the copies were written.
+    """
+    path = str(path)
+
+    try:
+        with open(path, "rb") as f:
+            content = f.read()
+    except OSError as e:
+        logging.debug("Unable to compress %s: %s", path, e)
+        return path, None, False
+
+    new_digest = hashlib.sha256(content).hexdigest()
+    compressions = encoders()
+
+    if new_digest == digest and all(os.path.exists(path + suffix) for suffix in compressions):
+        return path, new_digest, False
+
+    for suffix, compress in compressions.items():
+        tmp_path = f"{path}{suffix}.{os.getpid()}.tmp"
+
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(compress(content))
+            os.replace(tmp_path, path + suffix)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    return path, new_digest, True
+
+
+def compressed_paths(path: str | pathlib.Path) -> list[str]:
+    """Returns the paths of the compressed copies of `path`"""
+    return [f"{path}{suffix}" for suffix in encoders()]
@@ -1,17 +1,27 @@
+import logging
+import pathlib
 import urllib.parse
 from datetime import datetime
 from email import utils
 
 from jinja2 import (
+    BaseLoader,
     ChoiceLoader,
     Environment,
+    FileSystemBytecodeCache,
     FileSystemLoader,
     PackageLoader,
+    TemplateError,
+    meta,
+    nodes,
+    pass_context,
     pass_environment,
     select_autoescape,
 )
+from jinja2.runtime import Context
 
-from .collection import Collection
+from .cache import fingerprint
+from .routes import RouteIndex
 
 render_engine_templates_loader = ChoiceLoader(
     [
@@ -28,6 +38,115 @@ engine = Environment(
 )
 
 
+def use_bytecode_cache(env: Environment, directory: str | pathlib.Path) -> None:
+    """
+    Stores the compiled templates of `env` in `directory`.
+
+    Later builds load the compiled templates instead of compiling them again.
+    Templates are recompiled when their source changes.
+    """
+    pathlib.Path(directory).mkdir(parents=True, exist_ok=True)
+    env.bytecode_cache = FileSystemBytecodeCache(str(directory))
+
+
+def _list_templates(loader: BaseLoader) -> list[str]:
+    """Returns the templates from every loader that supports listing them"""
+    if isinstance(loader, ChoiceLoader):
+        return sorted({name for _loader in loader.loaders for name in _list_templates(_loader)})
+
+    try:
+        return loader.list_templates()
+    except TypeError:
+        logging.debug("Unable to list the templates of %s", loader)
+        return []
+
+
+def precompile_templates(env: Environment) -> int:
+    """
+    Compiles every template that the environment's loaders can list.
+
+    When the environment has a `bytecode_cache`, the compiled templates are stored in it ahead of time.
+    Returns the number of templates that were compiled.
+    """
+    compiled = 0
+
+    for name in _list_templates(env.loader):
+        try:
+            env.get_template(name)
+        except (TemplateError, UnicodeDecodeError) as e:
+            logging.debug("Skipping template %s: %s", name, e)
+            continue
+
+        compiled += 1
+
+    return compiled
+
+
+def loader_paths(loader: BaseLoader) -> list[pathlib.Path]:
+    """Returns the directories the templates of a loader (and the loaders it chooses from) are read from"""
+    if isinstance(loader, ChoiceLoader):
+        return [path for _loader in loader.loaders for path in loader_paths(_loader)]
+
+    if isinstance(loader, FileSystemLoader):
+        return [pathlib.Path(path) for path in loader.searchpath]
+
+    if isinstance(loader, PackageLoader) and (template_root := getattr(loader, "_template_root", None)):
+        return [pathlib.Path(template_root)]
+
+    return []
+
+
+# the globals that filters read, which templates using the filter depend on
+FILTER_GLOBALS = {"url_for": "routes", "feed_url": "routes", "static_url": "assets", "to_absolute": "SITE_URL"}
+
+
+def template_dependencies(env: Environment, *names: str) -> tuple[dict[str, str], set[str], set[str]] | None:
+    """
+    Returns the templates that rendering `names` loads, the variables those templates read and their files.
+
+    The templates (`names` and every template they `extend`, `include` or `import`) are resolved
+    through the environment's loader and mapped to a fingerprint of their source and filename,
+    so switching to a template from a different loader also counts as a change.
+
+    The variables are the names the templates read.
+    They may include local names (like loop variables) that happen to share a name with a global.
+    The globals read by filters (like `routes` for `url_for`) are added when the templates use those filters.
+
+    Returns `None` if a template's dependencies can't be known ahead of rendering
+    (like `{% include page_template %}`).
+    """
+    templates = {}
+    variables = set()
+    filenames = set()
+    pending = list(names)
+
+    while pending:
+        if (template_name := pending.pop()) in templates:
+            continue
+
+        source, filename, _ = env.loader.get_source(env, template_name)
+        templates[template_name] = fingerprint(filename, source)
+
+        if filename:
+            filenames.add(filename)
+
+        ast = env.parse(source, template_name, filename)
+
+        for reference in meta.find_referenced_templates(ast):
+            if reference is None:
+                return None
+            pending.append(reference)
+
+        # unlike `meta.find_undeclared_variables`, this keeps the names that are provided by the globals
+        variables.update(node.name for node in ast.find_all(nodes.Name) if node.ctx == "load")
+
+        variables.update(
+            FILTER_GLOBALS[node.name] for node in ast.find_all(nodes.Filter) if node.name in FILTER_GLOBALS
+        )
+
+    return templates, variables, filenames
+
+
 def to_pub_date(value: datetime):
     """
     Parse information from the given class object.
@@ -51,44 +170,47 @@ def format_datetime(env: Environment, value: str, datetime_format: str | None =
 engine.filters["format_datetime"] = format_datetime
 
 
-@pass_environment
-def to_absolute(env: Environment, url: str) -> str:
-    return urllib.parse.urljoin(env.globals.get("SITE_URL"), url)
+@pass_context  # like the filters below, it reads globals that change between builds, so it isn't folded into templates
+def to_absolute(context: Context, url: str) -> str:
+    return urllib.parse.urljoin(context.environment.globals.get("SITE_URL"), url)
 
 
 engine.filters["to_absolute"] = to_absolute
 
 
-@pass_environment
-def feed_url(env: Environment, value: str) -> str:
-    """Returns the URL for the collections feed"""
-    routes = env.globals.get("routes")
-    return routes[value].feed.url_for()
+@pass_context  # the fingerprints change between builds, so calls aren't evaluated when the template is compiled
+def static_url(context: Context, path: str) -> str:
+    """Returns the URL for a static file, using its fingerprinted name when static files are fingerprinted"""
+    path = path.lstrip("/")
+    return f"/{context.environment.globals.get('assets', {}).get(path, path)}"
 
 
-engine.filters["feed_url"] = feed_url
+engine.filters["static_url"] = static_url
 
 
-@pass_environment
-def url_for(env: Environment, value: str, page: int = 0) -> str:
-    """Look for the route in the route_list and return the url for the page."""
+def _route_index(env: Environment) -> RouteIndex:
+    """Returns the route index of the current build, creating one if the routes changed"""
     routes = env.globals.get("routes")
-    route = value.split(".", maxsplit=1)
 
-    if len(route) == 2 and isinstance(route, list):
-        collection, route = route
-        if collection := routes.get(collection, None):
-            for page in collection:
-                if getattr(page, page._reference) == route:
-                    return page.url_for()
+    if (index := env.globals.get("route_index")) is None or index.route_list is not routes:
+        index = env.globals["route_index"] = RouteIndex(routes)
+
+    return index
 
-    else:
-        route = routes.get(value)
-        if isinstance(route, Collection):
-            return list(route.archives)[page].url_for()
-        return route.url_for()
 
-    raise ValueError(f"{value} is not a valid route.")
+@pass_context
+def feed_url(context: Context, value: str) -> str:
+    """Returns the URL for the collections feed"""
+    return _route_index(context.environment).feed_url(value)
+
+
+engine.filters["feed_url"] = feed_url
+
+
+@pass_context
+def url_for(context: Context, value: str, page: int = 0) -> str:
+    """Look for the route in the route_list and return the url for the page."""
+    return _route_index(context.environment).url_for(value, page)
 
 
 engine.filters["url_for"] = url_for
@@ -2,10 +2,28 @@
 Feed Objects for Generating RSS Feeds
 """
 
+import typing
+from collections.abc import Callable, Iterator
 
+import jinja2
+from markupsafe import Markup
+
+from .cache import ParseCache, fingerprint, parser_fingerprint
 from .page import BasePage
 
 
+def _global_data(name: str, value: typing.Any) -> typing.Any:
+    """Returns the data of a template global that rendered items depend on"""
+    if name == "site":
+        return getattr(value, "site_vars", value)
+
+    if name == "routes":
+        # urls are built from the route names and the routes of each entry
+        return {route: list(getattr(entry, "routes", [])) for route, entry in value.items()}
+
+    return value
+
+
 class RSSFeed(BasePage):
     """
     Creates an RSS feed [`Page`][render_engine.Page] Object.
@@ -15,6 +33,11 @@ class RSSFeed(BasePage):
         by the standards defined in the [RSS 2.0 Specification](http://www.rssboard.org/rss-specification)
 
     This is built using the built-in `rss2.0.xml` jinja template.
+    Each item is rendered with `item_template` and the rendered items are cached (in the collection's
+    `parse_cache` if it has one), so items that didn't change are not rendered again.
+    Items are rendered again when the templates they load or the globals those templates read change.
+
+    Feeds are written to disk as they are rendered (`stream`) instead of being held in memory.
 
     !!! Note
         Some browsers may not support the `rss` extension.
@@ -35,4 +58,54 @@ class RSSFeed(BasePage):
     """
 
     template = "rss2.0.xml"
+    item_template = "rss2.0_items.xml"
     extension: str = ".rss"
+    stream: bool = True
+
+    def _item_renderer(self, engine: jinja2.Environment, **kwargs) -> Callable[[BasePage], Markup]:
+        """Returns the `render_item` function used by the feed template"""
+        # the engine module imports the collections, which import the feeds
+        from .engine import template_dependencies
+
+        template = engine.get_template(self.item_template)
+
+        if (dependencies := template_dependencies(engine, self.item_template)) is None:
+            # the templates the items load can't be known, so the rendered items can't be reused
+            return lambda item: Markup(template.render(item=item, **kwargs))
+
+        templates, variables, _ = dependencies
+        template_globals = {
+            name: _global_data(name, engine.globals[name]) for name in variables & engine.globals.keys()
+        }
+        template_key = fingerprint(templates, template_globals, kwargs)
+        cache = getattr(self, "_parse_cache", None) or ParseCache()
+
+        def render_item(item: BasePage) -> Markup:
+            """Renders a feed item, reusing the rendered item if its content and attributes didn't change"""
+            data = {key: value for key, value in vars(item).items() if not key.startswith("_")}
+            # the collection is the same for every item and the rendered page isn't part of the item
+            data.pop("collection", None)
+            data.pop("rendered_content", None)
+            # the parsed content changes with the parser's implementation, like `ParseCache` keys
+            parser = parser_fingerprint(Parser) if (Parser := getattr(item, "Parser", None)) else None
+            key = fingerprint("rss-item", template_key, type(item), parser, item.url_for(), data)
+
+            if (fragment := cache.get(key)) is None:
+                fragment = template.render(item=item, **kwargs)
+                cache.set(key, fragment)
+
+            return Markup(fragment)
+
+        return render_item
+
+    def _render_content(self, engine: jinja2.Environment | None = None, **kwargs) -> str:
+        if (engine := getattr(self, "engine", engine)) and "render_item" not in kwargs:
+            kwargs["render_item"] = self._item_renderer(engine, **kwargs)
+
+        return super()._render_content(engine, **kwargs)
+
+    def _generate_content(self, engine: jinja2.Environment | None = None, **kwargs) -> Iterator[str]:
+        if (engine := getattr(self, "engine", engine)) and "render_item" not in kwargs:
+            kwargs["render_item"] = self._item_renderer(engine, **kwargs)
+
+        return super()._generate_content(engine, **kwargs)
@@ -1,6 +1,7 @@
 # ruff: noqa: F821
 
 import typing
+import weakref
 
 import pluggy
 
@@ -9,16 +10,44 @@ hook_impl = pluggy.HookimplMarker(project_name=_PROJECT_NAME)
 hook_spec = pluggy.HookspecMarker(project_name=_PROJECT_NAME)
 
 
+# managers are dropped once no site, collection or page uses them (like after the site's module is reloaded)
+_plugin_managers: weakref.WeakValueDictionary[tuple[int, ...], pluggy.PluginManager] = weakref.WeakValueDictionary()
+
+
 def register_plugins(plugins):
-    """Register the plugins with the plugin manager"""
-    pm = pluggy.PluginManager(project_name=_PROJECT_NAME)
-    pm.add_hookspecs(SiteSpecs)
+    """
+    Returns a plugin manager with the plugins registered.
+
+    Plugin managers are shared by every object that registers the same plugins (like the pages of a collection),
+    so they are only created once while they are in use. The returned plugin manager must not be modified.
+    """
+    plugins = list(plugins)
+    # plugins don't have to be hashable (like dataclass instances). The manager keeps the plugins alive, so the ids
+    # of a cached manager's plugins aren't reused
+    key = tuple(id(plugin) for plugin in plugins)
+
+    if (pm := _plugin_managers.get(key)) is None:
+        pm = pluggy.PluginManager(project_name=_PROJECT_NAME)
+        pm.add_hookspecs(SiteSpecs)
+
+        for plugin in plugins:
+            pm.register(plugin)
+
+        _plugin_managers[key] = pm
 
-    for plugin in plugins:
-        pm.register(plugin)
     return pm
 
 
+def call_hook(pm: pluggy.PluginManager, name: str, **kwargs) -> list:
+    """Calls the hook, skipping the call entirely when no plugin implements it"""
+    hook = getattr(pm.hook, name)
+
+    if not hook.get_hookimpls():
+        return []
+
+    return hook(**kwargs)
+
+
 class SiteSpecs:
     """Plugin hook specifications for the Site class"""
 
@@ -68,6 +97,31 @@ class SiteSpecs:
         Augments the content of the page before it is rendered as output.
         """
 
+    @hook_spec
+    def render_content_batch(
+        self,
+        pages: list["Page"],
+        settings: dict[str, typing.Any],
+    ) -> None:
+        """
+        Augments the content of a batch of pages before they are rendered as output.
+
+        This is called once per batch (before `render_content` is called for each page),
+        in the process that renders the batch, so expensive setup can be shared by the pages.
+        """
+
+    @hook_spec
+    def post_render_batch(
+        self,
+        pages: list["Page"],
+        site: "Site",
+    ) -> None:
+        """
+        Steps After rendering a batch of pages.
+
+        This is called once per batch, after `post_render_content` was called for each page.
+        """
+
     @hook_spec
     def pre_build_collection(
         self,
@@ -79,7 +133,8 @@ class SiteSpecs:
     @hook_spec
     def post_build_collection(
         self,
+        collection: "Collection",
         site: "Site",
         settings: dict[str, typing.Any],
     ) -> None:
-        """Build After Building the collection"""
+        """Build After Building the collection, once the collection's pages are written"""
@@ -0,0 +1,227 @@
+"""A record of what each build read and wrote, used to skip outputs that are already up to date."""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import typing
+
+import git
+
+from .cache import CACHE_VERSION
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+@dataclasses.dataclass
+class ChangeSet:
+    """
+    The source files that changed since the last build.
+
+    Attributes:
+        added: files that weren't seen by the last build
+        modified: files whose content changed
+        deleted: files that were seen by the last build and no longer exist
+        renamed: the new path of files that were moved, keyed by their old path
+    """
+
+    added: set[str] = dataclasses.field(default_factory=set)
+    modified: set[str] = dataclasses.field(default_factory=set)
+    deleted: set[str] = dataclasses.field(default_factory=set)
+    renamed: dict[str, str] = dataclasses.field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.deleted or self.renamed)
+
+    @classmethod
+    def from_git(cls, since: str, path: str | pathlib.Path = ".") -> "ChangeSet":
+        """
+        Returns the files that changed between the `since` revision and `HEAD` of the repository at `path`.
+
+        The changes come from a single tree diff, so uncommitted changes are ignored.
+        The paths are absolute.
+
+        params:
+            since: any revision git understands (a commit, tag or branch)
+            path: a path inside the repository
+        """
+        repo = git.Repo(path, search_parent_directories=True)
+        root = repo.working_tree_dir
+        changes = cls()
+
+        for diff in repo.commit(since).diff("HEAD"):
+            old_path = os.path.join(root, diff.a_path) if diff.a_path else None
+            new_path = os.path.join(root, diff.b_path) if diff.b_path else None
+
+            if diff.change_type == "A":
+                changes.added.add(new_path)
+            elif diff.change_type == "D":
+                changes.deleted.add(old_path)
+            elif diff.change_type == "R":
+                changes.renamed[old_path] = new_path
+            else:
+                changes.modified.add(new_path)
+
+        return changes
+
+
+class BuildManifest:
+    """
+    The outputs of the last build and the inputs each of them was rendered from.
+
+    Each output is mapped to its inputs (source files, templates, globals...) and their fingerprints.
+    An output only needs to be rendered again if one of its inputs changed since it was written.
+
+    The modification time, size and hash of every source file are recorded too.
+    A file is only read again when its modification time or size changed, so finding the
+    changes of an unchanged site only costs a `stat` per file.
+
+    The manifest is stored as JSON. A missing or unreadable manifest is treated as empty,
+    so the next build renders everything.
+
+    Attributes:
+        path: The JSON file the manifest is stored in.
+        outputs: The inputs of each output, keyed by the output path.
+        sources: The `[mtime_ns, size, hash]` of each source file, keyed by its path.
+        files: Every file the build wrote to the output path (including static files and plugin outputs).
+        compressed: The hash of each output when its compressed copies were written, keyed by the output path.
+    """
+
+    def __init__(
+        self,
+        path: str | pathlib.Path,
+        outputs: dict[str, dict[str, str]] | None = None,
+        sources: dict[str, list] | None = None,
+        files: typing.Iterable[str] | None = None,
+        compressed: dict[str, str] | None = None,
+    ) -> None:
+        self.path = pathlib.Path(path)
+        self.outputs = outputs or {}
+        self.sources = sources or {}
+        self.files = set(files or ())
+        self.compressed = compressed or {}
+
+    @classmethod
+    def load(cls, path: str | pathlib.Path) -> "BuildManifest":
+        """Reads the manifest stored in `path`"""
+        try:
+            data = json.loads(pathlib.Path(path).read_text())
+
+            if data.get("version") != CACHE_VERSION.decode():
+                raise ValueError("manifest version changed")
+
+            return cls(path, data["outputs"], data["sources"], data["files"], data.get("compressed"))
+
+        except FileNotFoundError:
+            return cls(path)
+
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logging.debug("Ignoring unreadable manifest %s: %s", path, e)
+            return cls(path)
+
+    def save(self) -> None:
+        """Writes the manifest to its path"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    "version": CACHE_VERSION.decode(),
+                    "outputs": self.outputs,
+                    "sources": self.sources,
+                    "files": sorted(self.files),
+                    "compressed": self.compressed,
+                },
+                sort_keys=True,
+            )
+        )
+        os.replace(tmp_path, self.path)
+
+    def is_current(self, output: str | pathlib.Path, inputs: dict[str, str] | None) -> bool:
+        """Returns True if `output` exists and was written from the same `inputs`"""
+        if inputs is None:
+            return False
+
+        return self.outputs.get(str(output)) == inputs and pathlib.Path(output).exists()
+
+    def _check(self, path: str, stat: os.stat_result) -> bool:
+        """Records the file and returns True if its content changed (or it is new)"""
+        record = self.sources.get(path)
+
+        if record and record[:2] == [stat.st_mtime_ns, stat.st_size]:
+            return False
+
+        digest = _hash_file(path)
+        self.sources[path] = [stat.st_mtime_ns, stat.st_size, digest]
+        return not record or record[2] != digest
+
+    def source_fingerprint(self, path: str | pathlib.Path) -> str:
+        """Returns the hash of the file, only reading it if it changed since it was recorded"""
+        path = str(path)
+
+        try:
+            self._check(path, os.stat(path))
+        except OSError:
+            self.sources.pop(path, None)
+            return "missing"
+
+        return self.sources[path][2]
+
+    def scan(self, directories: typing.Iterable[str | pathlib.Path]) -> ChangeSet:
+        """
+        Finds the files in `directories` (and their subdirectories) that changed since the last build.
+
+        The directories are walked once with `os.scandir` and the records of the files are updated,
+        so the following calls to `source_fingerprint` don't have to read them again.
+        """
+        changes = ChangeSet()
+        seen = set()
+        pending = [str(directory) for directory in directories]
+        roots = [os.path.join(directory, "") for directory in pending]
+
+        while pending:
+            try:
+                entries = os.scandir(pending.pop())
+            except OSError:
+                continue
+
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                        continue
+
+                    if not entry.is_file() or entry.path in seen:
+                        continue
+
+                    seen.add(entry.path)
+                    is_new = entry.path not in self.sources
+
+                    try:
+                        if self._check(entry.path, entry.stat()):
+                            (changes.added if is_new else changes.modified).add(entry.path)
+                    except OSError:
+                        continue
+
+        added = {self.sources[path][2]: path for path in changes.added}
+
+        for path in list(self.sources):
+            if path not in seen and path.startswith(tuple(roots)):
+                # a deleted file with the same content as an added file was moved
+                if (new_path := added.pop(self.sources.pop(path)[2], None)) is not None:
+                    changes.added.discard(new_path)
+                    changes.renamed[path] = new_path
+                else:
+                    changes.deleted.add(path)
+
+        return changes
@@ -1,8 +1,10 @@
+from collections.abc import Iterator
 from typing import Any
 
 import jinja2
 
-from ._base_object import BaseObject
+from ._base_object import BaseObject, TemplateContext
+from .cache import ParseCache
 from .parsers.base_parsers import BasePageParser
 
 
@@ -55,14 +57,40 @@ class BasePage(BaseObject):
             return f"/{route}/{self.path_name}"
 
     def _render_from_template(self, template: jinja2.Template, **kwargs) -> str:
-        """Renders the page from a template."""
-        return template.render(
-            **{
-                **self.to_dict(),
-                **{"content": self._content},
-                **kwargs,
-            },
-        )
+        """
+        Renders the page from a template.
+
+        The template reads its variables from a [`TemplateContext`][src.render_engine._base_object.TemplateContext]
+        view of the page, so only the variables a template uses are computed.
+        """
+        context = template.new_context(TemplateContext(self, template.globals, **kwargs), shared=True)
+
+        try:
+            return template.environment.concat(template.root_render_func(context))
+        except Exception:
+            return template.environment.handle_exception()
+
+    def _generate_from_template(self, template: jinja2.Template, **kwargs) -> Iterator[str]:
+        """Renders the page from a template, yielding the output as it is rendered (like `Template.generate`)."""
+        context = template.new_context(TemplateContext(self, template.globals, **kwargs), shared=True)
+
+        try:
+            yield from template.root_render_func(context)
+        except Exception:
+            yield template.environment.handle_exception()
+
+    def _generate_content(self, engine: jinja2.Environment | None = None, **kwargs) -> Iterator[str]:
+        """
+        Renders the content of the page in chunks.
+
+        Pages with a template are rendered incrementally, so the whole output doesn't have to be held in memory.
+        """
+        engine = getattr(self, "engine", engine)
+
+        if getattr(self, "template", None) and engine:
+            yield from self._generate_from_template(engine.get_template(self.template), **kwargs)
+        else:
+            yield self._render_content(engine, **kwargs)
 
     def _render_content(self, engine: jinja2.Environment | None = None, **kwargs) -> str:
         """Renders the content of the page."""
@@ -76,15 +104,15 @@ class BasePage(BaseObject):
 
         # Parsing without a template
         try:
-            if isinstance(self._content, str):
-                return self._content
+            if isinstance(content := self._content, str):
+                return content
 
             else:
                 raise ValueError("The returned content attribute must be a string.")
 
         except AttributeError:
             raise AttributeError(
-                f"{self} does not have a content attribute. " "You must either provide a template or content."
+                f"{self} does not have a content attribute. You must either provide a template or content."
             )
 
     def __str__(self):
@@ -128,6 +156,9 @@ class Page(BasePage):
             The parser to generate the page's `raw_content`.
             Defaults to `BasePageParser`.
         title: The title of the page. Defaults to the class name.
+        parse_cache:
+            An optional [`ParseCache`][src.render_engine.cache.ParseCache] that is checked
+            before the content is parsed.
 
     """
 
@@ -143,13 +174,18 @@ class Page(BasePage):
         content_path: str | None = None,
         content: Any | None = None,
         Parser: type[BasePageParser] | None = None,
+        parse_cache: ParseCache | None = None,
     ) -> None:
         if Parser:
             self.Parser = Parser
 
+        if parse_cache:
+            self._parse_cache = parse_cache
+
         # Parse Content from the Content Path or the Content
         if content_path := (content_path or getattr(self, "content_path", None)):
-            attrs, self.content = self.Parser.parse_content_path(content_path)
+            self.content_path = content_path
+            attrs = self._parse_content_path()
 
         elif content := (content or getattr(self, "content", None)):
             attrs, self.content = self.Parser.parse_content(content)
@@ -162,7 +198,50 @@ class Page(BasePage):
         for key, val in attrs.items():
             setattr(self, key.lower(), val)
 
+    def _parse_content_path(self) -> dict[str, Any]:
+        """Sets the `content` from the `content_path` and returns the attributes parsed with it"""
+        if parse_cache := getattr(self, "_parse_cache", None):
+            attrs, self.content = parse_cache.parse_content_path(self.Parser, self.content_path)
+        else:
+            attrs, self.content = self.Parser.parse_content_path(self.content_path)
+
+        return attrs
+
+    def _reload_content(self) -> None:
+        """Parses the `content_path` again, after the file changed"""
+        for key, val in self._parse_content_path().items():
+            setattr(self, key.lower(), val)
+
+    def _content_key(self) -> tuple:
+        """The values that the parsed content depends on"""
+        return (self.content, self.Parser, repr(getattr(self, "parser_extras", None)))
+
     @property
     def _content(self):
-        """Returns the content of the page."""
-        return self.Parser.parse(self.content, page=self)
+        """
+        Returns the parsed content of the page.
+
+        The content is only parsed once and reused until `content`, `Parser` or `parser_extras` change.
+        """
+        key = self._content_key()
+
+        if (memo := getattr(self, "_content_memo", None)) and memo[0] == key:
+            return memo[1]
+
+        if parse_cache := getattr(self, "_parse_cache", None):
+            markup = parse_cache.parse(self.Parser, self.content, page=self)
+        else:
+            markup = self.Parser.parse(self.content, page=self)
+
+        self._content_memo = (key, markup)
+        return markup
+
+    @_content.setter
+    def _content(self, markup) -> None:
+        """
+        Replaces the parsed content of the page.
+
+        This allows plugins (like those implementing `render_content`) to rewrite the content.
+        The replacement is kept until `content`, `Parser` or `parser_extras` change.
+        """
+        self._content_memo = (self._content_key(), markup)
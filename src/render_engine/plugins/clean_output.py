@@ -24,10 +24,20 @@ class CleanOutput:
     ):
         """Clean the output folder before rendering.
 
+        The files written by the last build are recorded, so instead of removing the output folder,
+        only the files that the new build doesn't write again are removed once it is done.
+        The output folder is only removed when there is no record of the last build.
+
         parameters:
             site: The site object
             settings: The settings for the site
                 ignore_errors: If True, ignore errors when removing the output folder
         """
+        site.prune_outputs = True
+
+        if (manifest := site._load_manifest()) and manifest.files:
+            logging.info(f"Removing outputs of the last build from {site.output_path} that are not written again")
+            return
+
         logging.warning(f"Removing {site.output_path} (if exist) before rendering")
         shutil.rmtree(site.output_path, ignore_errors=settings["CleanOutput"].get("ignore_errors", False))
@@ -1,19 +1,179 @@
+import dataclasses
+import filecmp
 import logging
+import os
 import pathlib
+import re
+import time
 import typing
 
+from jinja2 import Template
+from more_itertools import peekable
+
+from render_engine.compression import compressed_paths
 from render_engine.engine import engine
 from render_engine.hookspecs import hook_impl
+from render_engine.page import Page
 from render_engine.site import Site
 
+# room left in a sitemap for the next item and the closing tag
+_SIZE_MARGIN = 16 * 1024
+
+
+@dataclasses.dataclass
+class SiteMapItem:
+    """A URL in the sitemap. Items render as their path, relative to the site's output path."""
+
+    path: str
+    lastmod: str | None = None
+    changefreq: str | None = None
+    priority: float | None = None
+
+    def __str__(self) -> str:
+        return self.path
+
+
+def _lastmod(site: Site, page: Page) -> str | None:
+    """Returns the modification time of the newest file the page was generated from"""
+    pages = getattr(page, "pages", None) or [page]
+    # the content files are preferred over the modules the pages are defined in
+    sources = {str(path) for _page in pages if (path := getattr(_page, "content_path", None))}
+    mtimes = []
+
+    for source in sources or site._page_sources(page):
+        try:
+            mtimes.append(os.stat(source).st_mtime)
+        except OSError:
+            continue
+
+    if not mtimes:
+        return None
+
+    return time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(max(mtimes)))
+
+
+def _site_map_items(site: Site, pattern: str, lastmod: bool) -> typing.Generator[SiteMapItem, None, None]:
+    """Yields the pages this build rendered that match the pattern"""
+    output_path = pathlib.Path(site.output_path)
+
+    if (outputs := getattr(site, "_output_pages", None)) is None:
+        for path in sorted(output_path.rglob(pattern)):
+            yield SiteMapItem(path.relative_to(output_path).as_posix())
+        return
+
+    lastmods = {}
+
+    for output in sorted(outputs):
+        path = pathlib.Path(output)
+
+        if not (path.match(pattern) and path.is_relative_to(output_path)):
+            continue
+
+        item = SiteMapItem(path.relative_to(output_path).as_posix())
+
+        if lastmod:
+            page = outputs[output]
+
+            if id(page) not in lastmods:
+                lastmods[id(page)] = _lastmod(site, page)
+
+            item.lastmod = lastmods[id(page)]
+
+        yield item
+
+
+def _site_map_chunks(
+    template: Template,
+    items: peekable,
+    max_urls: int,
+    max_size: int,
+) -> typing.Generator[str, None, None]:
+    """Streams a sitemap with the next items, stopping before it has `max_urls` items or `max_size` bytes"""
+    size = 0
+
+    def shard_items():
+        for count in range(max_urls):
+            if not items or (count and size > max_size - _SIZE_MARGIN):
+                return
+            yield next(items)
+
+    for chunk in template.generate(items=shard_items()):
+        size += len(chunk.encode())
+        yield chunk
+
+
+def _remove_site_map(site: Site, path: pathlib.Path) -> None:
+    """Removes a sitemap that is no longer written, with its compressed copies"""
+    site._remove_output(path)
+
+    for compressed_path in compressed_paths(path):
+        pathlib.Path(compressed_path).unlink(missing_ok=True)
+
+
+def write_site_maps(
+    site: Site,
+    template: Template,
+    items: typing.Iterable[SiteMapItem],
+    path: pathlib.Path,
+    max_urls: int,
+    max_size: int,
+) -> list[pathlib.Path]:
+    """
+    Streams the items to sitemaps of at most `max_urls` URLs and `max_size` bytes.
+
+    If the items fit in one sitemap it is written to `path`.
+    Otherwise the sitemaps are numbered (`sitemap-1.xml`, `sitemap-2.xml`...).
+    Sitemaps left by an earlier build that was split into more sitemaps are removed.
+    Returns the paths of the sitemaps.
+    """
+    items = peekable(items)
+    paths = [path]
+    site._write_stream(path, _site_map_chunks(template, items, max_urls, max_size))
+
+    while items:
+        if len(paths) == 1:
+            paths[0] = path.with_name(f"{path.stem}-1{path.suffix}")
+
+            # an unchanged first sitemap is kept, so it isn't written again
+            if paths[0].exists() and filecmp.cmp(path, paths[0], shallow=False):
+                path.unlink()
+            else:
+                os.replace(path, paths[0])
+
+            if (outputs := getattr(site, "_outputs", None)) is not None:
+                outputs.discard(str(path))
+                outputs.add(str(paths[0]))
+
+        paths.append(path.with_name(f"{path.stem}-{len(paths) + 1}{path.suffix}"))
+        site._write_stream(paths[-1], _site_map_chunks(template, items, max_urls, max_size))
+
+    # an earlier build may have split the sitemap into more sitemaps
+    shard_name = re.compile(rf"{re.escape(path.stem)}-\d+{re.escape(path.suffix)}")
+
+    for stale in sorted(path.parent.glob(f"{path.stem}-*{path.suffix}")):
+        if shard_name.fullmatch(stale.name) and stale not in paths:
+            _remove_site_map(site, stale)
+
+    return paths
+
 
 class SiteMap:
-    """Generate a sitemap.xml file"""
+    """
+    Generate a sitemap.xml file from the pages rendered by the build.
+
+    Sites with more than `max_urls` URLs (or sitemaps larger than `max_size` bytes)
+    are split into numbered sitemaps that are listed in a sitemap index.
+    """
 
     default_settings = {
         "template": "sitemap.xml",
         "output_path": "sitemap.xml",
         "map_item_pattern": "*.html",
+        "lastmod": False,
+        "max_urls": 50_000,
+        "max_size": 50 * 1024 * 1024,
+        "index_template": "sitemap_index.xml",
+        "index_output_path": "sitemap_index.xml",
     }
 
     @hook_impl
@@ -29,17 +189,37 @@ class SiteMap:
                 template: The template to use for the sitemap.xml file
                 output_path: The path to the sitemap.xml file. output_path is relative to the output_path of the site
                 map_item_pattern: The pattern to use to find the files to include in the sitemap.xml file
+                lastmod: If True, the `lastmod` of each page is the modification time of its newest source file
+                max_urls: The maximum number of URLs in a sitemap
+                max_size: The maximum size of a sitemap in bytes
+                index_template: The template to use for the sitemap index
+                index_output_path: The path to the sitemap index, written if the sitemap is split
         """
+        settings = {**SiteMap.default_settings, **settings["SiteMap"]}
         logging.info(
-            f"""Generating sitemap - {settings['SiteMap']['output_path']}
-                     from files matching - {settings['SiteMap']['map_item_pattern']}
-                     using template - {settings['SiteMap']['template']}"""
+            f"""Generating sitemap - {settings["output_path"]}
+                     from files matching - {settings["map_item_pattern"]}
+                     using template - {settings["template"]}"""
         )
-        template = engine.get_template(settings["SiteMap"]["template"])
-        site_map_items = pathlib.Path(site.output_path).rglob(settings["SiteMap"]["map_item_pattern"])
-        sitemap_path = pathlib.Path(site.output_path).joinpath(settings["SiteMap"]["output_path"])
-        sitemap_path.write_text(
-            template.render(
-                items=[item.relative_to(site.output_path) for item in site_map_items],
-            )
+        output_path = pathlib.Path(site.output_path)
+        sitemaps = write_site_maps(
+            site,
+            engine.get_template(settings["template"]),
+            _site_map_items(site, settings["map_item_pattern"], settings["lastmod"]),
+            output_path.joinpath(settings["output_path"]),
+            settings["max_urls"],
+            settings["max_size"],
         )
+
+        index_path = output_path.joinpath(settings["index_output_path"])
+
+        if len(sitemaps) > 1:
+            site._write_output(
+                index_path,
+                engine.get_template(settings["index_template"]).render(
+                    sitemaps=[sitemap.relative_to(output_path).as_posix() for sitemap in sitemaps],
+                ),
+            )
+        elif index_path.exists():
+            # the sitemap was split by an earlier build
+            _remove_site_map(site, index_path)
@@ -0,0 +1,84 @@
+"""An index of the site's routes used to look up URLs while rendering."""
+
+import typing
+
+from .collection import Collection
+
+
+class RouteIndex:
+    """
+    Answers the lookups of the `url_for` and `feed_url` filters with dictionary reads.
+
+    The index is built from a site's `route_list` once per build.
+    The URLs of a collection's pages, archives and feed are computed the first time
+    the collection is looked up and reused for the rest of the build.
+
+    Attributes:
+        route_list: The site's route list the index is built from.
+    """
+
+    def __init__(self, route_list: dict[str, typing.Any]) -> None:
+        self.route_list = route_list
+        self._page_urls: dict[str, dict[str, str]] = {}
+        self._archive_urls: dict[str, list[str]] = {}
+        self._feed_urls: dict[str, str] = {}
+
+    def _collection(self, name: str) -> Collection | None:
+        return collection if isinstance(collection := self.route_list.get(name), Collection) else None
+
+    def page_url(self, collection_name: str, reference: str) -> str | None:
+        """Returns the URL of the page of a collection with the `reference` or `None` if there isn't one"""
+        if (urls := self._page_urls.get(collection_name)) is None:
+            if (collection := self._collection(collection_name)) is None:
+                return None
+
+            urls = self._page_urls[collection_name] = {}
+
+            for page in collection:
+                urls.setdefault(getattr(page, page._reference), page.url_for())
+
+        return urls.get(reference)
+
+    def archive_url(self, collection_name: str, page: int = 0) -> str | None:
+        """Returns the URL of an archive page of the collection or `None` if it isn't a collection"""
+        if (urls := self._archive_urls.get(collection_name)) is None:
+            if (collection := self._collection(collection_name)) is None:
+                return None
+
+            urls = self._archive_urls[collection_name] = [archive.url_for() for archive in collection.archives]
+
+        return urls[page]
+
+    def feed_url(self, collection_name: str) -> str:
+        """Returns the URL of the collection's feed"""
+        if (url := self._feed_urls.get(collection_name)) is None:
+            collection = self.route_list[collection_name]
+            # the URL only depends on the feed's slug, so the feed doesn't need the collection's pages
+            feed = collection.Feed()
+            feed.slug = collection._slug
+            url = self._feed_urls[collection_name] = feed.url_for()
+
+        return url
+
+    def url_for(self, value: str, page: int = 0) -> str:
+        """
+        Returns the URL for a route of the site.
+
+        `value` is either the name of a page or collection in the route list
+        (`page` selects the archive page of a collection) or `collection.reference` for a page of a collection.
+        """
+        route = value.split(".", maxsplit=1)
+
+        if len(route) == 2:
+            url = self.page_url(*route)
+
+        elif (archive_url := self.archive_url(value, page)) is not None:
+            url = archive_url
+
+        else:
+            url = entry.url_for() if (entry := self.route_list.get(value)) is not None else None
+
+        if url is None:
+            raise ValueError(f"{value} is not a valid route.")
+
+        return url
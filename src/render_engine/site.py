@@ -1,17 +1,28 @@
+import json
 import logging
+import os
 import pathlib
+import sys
 import typing
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 import pluggy
 from jinja2 import Environment, FileSystemLoader
+from more_itertools import flatten
 from rich.progress import Progress
 
+from .cache import DEFAULT_CACHE_PATH, ParseCache, fingerprint
 from .collection import Collection
-from .engine import engine
-from .hookspecs import _PROJECT_NAME, SiteSpecs
+from .compression import compress_file, compressed_paths, is_compressible
+from .engine import engine, loader_paths, precompile_templates, template_dependencies, use_bytecode_cache
+from .hookspecs import _PROJECT_NAME, SiteSpecs, call_hook, register_plugins
+from .manifest import BuildManifest, ChangeSet
 from .page import Page
+from .routes import RouteIndex
 from .themes import Theme, ThemeManager
+from .utils.workers import run_in_workers
+from .writer import OutputWriter
 
 
 class Site(ThemeManager):
@@ -19,15 +30,45 @@ class Site(ThemeManager):
     The site stores your pages and collections to be rendered.
 
     Attributes:
+        cache_path:
+            directory used to store build caches. If set, parsed collection content is cached
+            between builds in `cache_path/cache` and compiled templates in `cache_path/jinja`.
+        compress_outputs:
+            if True, a gzip copy (and a brotli copy when `brotli` is installed) is written next to each text output,
+            like `index.html.gz`, for servers that serve pre-compressed files.
+            Only outputs whose content changed since the last build are compressed again.
+        compress_workers:
+            number of processes used to compress the outputs. Defaults to the number of CPUs.
         engine: Jinja2 Environment used to render pages
         output_path:
             path to write rendered content
         partial:
-            if True, only render pages that have been modified. Uses gitPython to check for changes.
+            if True, only render the outputs whose source files, templates or globals changed since the last build.
+            The inputs of each output are recorded in `cache_path/manifest.json`
+            (or `.render-engine/manifest.json` if `cache_path` is not set).
+            Changes are found from the modification time, size and hash of each source, so git isn't needed.
         plugins:
             list of plugins that will be loaded and passed into each object
+        prune_outputs:
+            if True, files written by the last build that this build didn't write are removed from the `output_path`.
+            The files written by each build are recorded in the same manifest as `partial` builds.
+        render_workers:
+            number of processes used to render pages. Pages are rendered serially if not set.
+        render_batch_size:
+            maximum number of pages rendered together. The batch plugin hooks are called once per batch
+            and each batch is rendered by a single worker process.
+        route_link_mode:
+            how a page with several routes is placed at its other routes after it is rendered once:
+            `"hardlink"`, `"reflink"` (shares the data blocks on filesystems that support it) or `"copy"`.
+            Hardlinks and reflinks fall back to a copy when they aren't supported.
+        write_workers:
+            number of background threads that write the rendered pages to disk while rendering continues.
+            If `0`, each page is written before the next one is rendered.
         static_paths:
             list of paths for static folders. This will get copied to the output folder. Folders are recursive.
+        fingerprint_static:
+            if True, static files are also written with a hash of their content in their name and
+            the `static_url` filter returns the fingerprinted URL. The mapping is written to `asset_manifest_path`.
         site_vars:
             dictionary that will be passed into page template
         site_settings:
@@ -35,7 +76,15 @@ class Site(ThemeManager):
     """
 
     _pm: pluggy.PluginManager
+    cache_path: str | pathlib.Path | None = None
+    compress_outputs: bool = False
+    compress_workers: int | None = None
     partial: bool = False
+    prune_outputs: bool = False
+    render_batch_size: int = 64
+    render_workers: int | None = None
+    route_link_mode: str = "reflink"
+    write_workers: int = 4
     site_settings: dict = {"plugins": {}}
     site_vars: dict = {
         "SITE_TITLE": "Untitled Site",
@@ -168,59 +217,492 @@ class Site(ThemeManager):
         page = Page()
         page.title = page._title  # Expose _title to the user through `title`
 
-        # copy the plugin manager, removing any plugins that the page has ignored
-        page._pm = self._pm
-
-        for plugin in getattr(page, "ignore_plugins", []):
-            page._pm.unregister(plugin)
+        # share the site's plugin manager, unless the page ignores some of the plugins
+        if ignore_plugins := getattr(page, "ignore_plugins", []):
+            page._pm = register_plugins(plugin for plugin in self.plugins if plugin not in ignore_plugins)
+        else:
+            page._pm = self._pm
 
         self.route_list[getattr(page, page._reference)] = page
 
-    def _render_output(self, route: str, page: Page):
-        """writes the page object to disk"""
-        path = pathlib.Path(self.output_path) / pathlib.Path(route) / pathlib.Path(page.path_name)
-        path.parent.mkdir(parents=True, exist_ok=True)
+    def _load_bytecode_cache(self) -> None:
+        """Stores compiled templates in the `cache_path`"""
+        if not self.cache_path:
+            return None
+
+        directory = pathlib.Path(self.cache_path) / "jinja"
+
+        if getattr(self.engine.bytecode_cache, "directory", None) != str(directory):
+            use_bytecode_cache(self.engine, directory)
+
+    def compile_templates(self) -> int:
+        """
+        Compiles the site's templates, including those from registered themes, ahead of a build.
+
+        The compiled templates are stored in the `cache_path` so that the next build can skip compiling them.
+        Returns the number of compiled templates.
+        """
+        self._load_bytecode_cache()
+        return precompile_templates(self.engine)
+
+    def _load_parse_cache(self) -> ParseCache | None:
+        """Creates the parse cache and passes it to the collections that don't have their own"""
+        if not self.cache_path:
+            return None
+
+        if not (parse_cache := getattr(self, "parse_cache", None)):
+            parse_cache = self.parse_cache = ParseCache(pathlib.Path(self.cache_path) / "cache")
+        parse_cache.hits = parse_cache.misses = 0
+
+        for entry in self.route_list.values():
+            if isinstance(entry, Collection) and not entry.parse_cache:
+                entry.parse_cache = parse_cache
+
+        return parse_cache
+
+    def _output_path(self, route: str, page: Page) -> pathlib.Path:
+        """Returns the path the page is written to for the route"""
+        return pathlib.Path(self.output_path) / pathlib.Path(route) / pathlib.Path(page.path_name)
+
+    def _render_page(self, route: str, page: Page) -> str:
+        """
+        renders the page object for the route, running the render plugins
+
+        Pages with several routes are only rendered for their first route.
+        """
         settings = {**self.site_settings.get("plugins", {}), **{"route": route}}
-        self._pm.hook.render_content(page=page, settings=settings)
+        call_hook(self._pm, "render_content", page=page, settings=settings)
         page.rendered_content = page._render_content(engine=self.engine)
         # pass the route to the plugin settings
-        self._pm.hook.post_render_content(page=page.__class__, settings=settings, site=self)
+        call_hook(self._pm, "post_render_content", page=page.__class__, settings=settings, site=self)
+
+        return page.rendered_content
 
-        return path.write_text(page.rendered_content)
+    def _stream_page(self, routes: list[str], page: Page) -> None:
+        """
+        renders the page straight to disk for its first route and places it at the other routes
 
-    def _render_partial_collection(self, collection: Collection) -> None:
-        """Iterate through the Changed Pages and Check for Collections and Feeds"""
-        for entry in collection._generate_content_from_modified_pages():
-            for route in collection.routes:
-                self._render_output(route, entry)
+        The output isn't held in memory, so `rendered_content` isn't set.
+        """
+        settings = {**self.site_settings.get("plugins", {}), **{"route": routes[0]}}
+        call_hook(self._pm, "render_content", page=page, settings=settings)
+        writer = getattr(self, "_writer", None) or OutputWriter()
+        path, *others = self._output_paths(routes, page)
+        self._write_stream(path, page._generate_content(engine=self.engine))
 
-        if getattr(collection, "has_archive", False):
-            for archive in collection.archives:
-                logging.debug("Adding Archive: %s", archive.__class__.__name__)
+        for other in others:
+            writer.copy(path, other, self.route_link_mode)
 
-                self._render_output(collection.routes[0], archive)
+        if (outputs := getattr(self, "_outputs", None)) is not None:
+            outputs.update(str(other) for other in others)
 
-        if hasattr(collection, "Feed"):
-            self._render_output("./", collection.feed)
+        call_hook(self._pm, "post_render_content", page=page.__class__, settings=settings, site=self)
 
-    def _render_full_collection(self, collection: Collection) -> None:
+    def _render_batch(self, jobs: list[tuple[list[str], Page]]) -> list[str]:
+        """renders a batch of (routes, page) jobs, calling the batch plugins once for the whole batch"""
+        pages = [page for _, page in jobs]
+        call_hook(self._pm, "render_content_batch", pages=pages, settings=self.site_settings.get("plugins", {}))
+        contents = [self._render_page(routes[0], page) for routes, page in jobs]
+        call_hook(self._pm, "post_render_batch", pages=pages, site=self)
+
+        return contents
+
+    def _output_paths(self, routes: list[str], page: Page) -> list[pathlib.Path]:
+        """Returns the paths the page is written to for each of the routes"""
+        return [self._output_path(route, page) for route in routes]
+
+    def _write_output(self, path: pathlib.Path, content: str) -> None:
+        """hands the rendered content to the output writer and records the output"""
+        self._write_outputs([path], content)
+
+    def _write_outputs(self, paths: list[pathlib.Path], content: str) -> None:
+        """hands the rendered content to the output writer to be written once and placed at every path"""
+        writer = getattr(self, "_writer", None) or OutputWriter()
+
+        if len(paths) == 1:
+            writer.write(paths[0], content)
+        else:
+            writer.write_many(paths, content, self.route_link_mode)
+
+        if (outputs := getattr(self, "_outputs", None)) is not None:
+            outputs.update(str(path) for path in paths)
+
+    def _write_stream(self, path: pathlib.Path, chunks: typing.Iterable[str]) -> None:
+        """writes the chunks to disk as they are generated (like the output of `Template.generate`)"""
+        (getattr(self, "_writer", None) or OutputWriter()).write_stream(path, chunks)
+
+        if (outputs := getattr(self, "_outputs", None)) is not None:
+            outputs.add(str(path))
+
+    def _render_output(self, route: str, page: Page):
+        """writes the page object to disk"""
+        return self._write_output(self._output_path(route, page), self._render_page(route, page))
+
+    def _full_collection_jobs(self, collection: Collection) -> typing.Generator[tuple[list[str], Page], None, None]:
         """Iterate through Pages and Check for Collections and Feeds"""
 
         for entry in collection:
-            for route in collection.routes:
-                self._render_output(route, entry)
+            yield list(collection.routes), entry
 
         if getattr(collection, "has_archive", False):
             for archive in collection.archives:
                 logging.debug("Adding Archive: %s", archive.__class__.__name__)
-
-                for route in collection.routes:
-                    self._render_output(collection.routes[0], archive)
+                yield [collection.routes[0]], archive
 
         if hasattr(collection, "Feed"):
-            self._render_output("./", collection.feed)
+            yield ["./"], collection.feed
+
+    def _render_jobs(self) -> list[tuple[list[str], Page]]:
+        """
+        Returns the (routes, page) pairs that will be rendered in this build.
+
+        Each page is rendered once and then placed at every one of its routes.
+        """
+        jobs = []
+
+        for entry in self.route_list.values():
+            if isinstance(entry, Page):
+                if getattr(entry, "collection", None):
+                    call_hook(self._pm, "render_content", Page=entry, settings=self.site_settings.get("plugins", None))
+                jobs.append((list(entry.routes), entry))
+
+            if isinstance(entry, Collection):
+                jobs.extend(self._full_collection_jobs(entry))
+
+        return jobs
+
+    def _output_routes(self) -> dict[str, tuple[list[str], Page]]:
+        """Returns the (routes, page) job that renders each output, keyed by its path relative to the output path"""
+        output_path = pathlib.Path(self.output_path)
+
+        return {
+            path.relative_to(output_path).as_posix(): (routes, page)
+            for routes, page in self._render_jobs()
+            for path in self._output_paths(routes, page)
+        }
+
+    def _render_in_memory(self, routes: list[str], page: Page) -> str:
+        """renders the page for its first route without writing it, running the render plugins"""
+        if not getattr(page, "stream", False):
+            return self._render_batch([(routes, page)])[0]
+
+        settings = {**self.site_settings.get("plugins", {}), **{"route": routes[0]}}
+        call_hook(self._pm, "render_content", page=page, settings=settings)
+        content = "".join(page._generate_content(engine=self.engine))
+        call_hook(self._pm, "post_render_content", page=page.__class__, settings=settings, site=self)
+
+        return content
 
-    def render(self) -> None:
+    def _load_manifest(self, partial: bool = False) -> BuildManifest | None:
+        """Returns the manifest of the last build, if builds are recorded"""
+        if not (self.cache_path or partial or self.prune_outputs or self.compress_outputs):
+            return None
+
+        return BuildManifest.load(pathlib.Path(self.cache_path or DEFAULT_CACHE_PATH) / "manifest.json")
+
+    def _page_sources(self, page: Page) -> set[str]:
+        """Returns the files the page (or the pages of an archive or feed) is generated from"""
+        if pages := getattr(page, "pages", None):
+            return {source for _page in pages for source in self._page_sources(_page)}
+
+        sources = set()
+
+        if content_path := getattr(page, "content_path", None):
+            sources.add(str(content_path))
+
+        if module_path := getattr(sys.modules.get(type(page).__module__), "__file__", None):
+            sources.add(module_path)
+
+        return sources
+
+    def _data_fingerprint(self, page: Page) -> str:
+        """Returns the (memoized) fingerprint of the page's sources and data"""
+        if (value := self._fingerprints.get(f"data:{id(page)}")) is None:
+            sources = {source: self._manifest.source_fingerprint(source) for source in self._page_sources(page)}
+            value = self._fingerprints[f"data:{id(page)}"] = fingerprint(sources, _page_data(page))
+
+        return value
+
+    def _routes_fingerprint(self) -> str:
+        """
+        Returns the fingerprint of the route list: the outputs and the sources and data of every page.
+
+        Templates can read any page through the `routes` (and `site`) globals, like a list of the latest posts.
+        """
+        if (value := self._fingerprints.get("routes")) is None:
+            # archives and feeds are made from the other pages
+            pages = [page for _, page in self._fingerprint_jobs if not getattr(page, "pages", None)]
+            value = self._fingerprints["routes"] = fingerprint(
+                self._fingerprint_outputs, [self._data_fingerprint(page) for page in pages]
+            )
+
+        return value
+
+    def _global_fingerprint(self, name: str) -> str:
+        if name == "routes":
+            return self._routes_fingerprint()
+
+        if name == "site":
+            return fingerprint(self.site_vars, self._routes_fingerprint())
+
+        return fingerprint(self.engine.globals[name])
+
+    def _template_dependencies(self, page: Page) -> tuple[dict[str, str], set[str], set[str]] | None:
+        """Returns the (memoized) dependencies of the page's template or `None` if they can't be known"""
+        if (template := getattr(page, "template", None)) is None:
+            return {}, set(), set()
+
+        if not isinstance(template, str):
+            return None
+
+        # feeds render their items with a separate template
+        templates = [template, *filter(None, [getattr(page, "item_template", None)])]
+        key = f"template:{'+'.join(templates)}"
+
+        if (dependencies := self._fingerprints.get(key)) is None:
+            try:
+                dependencies = template_dependencies(self.engine, *templates) or False
+            except Exception as e:
+                logging.debug("Unable to find the dependencies of %s: %s", template, e)
+                dependencies = False
+            self._fingerprints[key] = dependencies
+
+        return dependencies or None
+
+    def _output_inputs(self, page: Page) -> dict[str, str] | None:
+        """
+        Returns the inputs the page is rendered from, mapped to their fingerprints.
+
+        The inputs are the page's source files, its data, the templates it loads
+        and the globals those templates read.
+        Returns `None` if the inputs can't be known, so the page is always rendered.
+        """
+        if (dependencies := self._template_dependencies(page)) is None:
+            return None
+
+        templates, variables, _ = dependencies
+        inputs = {}
+
+        for source in sorted(self._page_sources(page)):
+            inputs[f"source:{source}"] = self._manifest.source_fingerprint(source)
+
+        inputs.update({f"template:{name}": value for name, value in templates.items()})
+
+        for name in sorted(variables & self.engine.globals.keys()):
+            inputs[f"global:{name}"] = self._global_fingerprint(name)
+
+        inputs["data"] = self._data_fingerprint(page)
+        return inputs
+
+    def _output_files(self, page: Page) -> set[str]:
+        """Returns the absolute paths of the source and template files the page is rendered from"""
+        _, _, filenames = self._template_dependencies(page) or ({}, set(), set())
+        return {os.path.abspath(path) for path in (*self._page_sources(page), *filenames)}
+
+    def _content_directories(self) -> list[pathlib.Path]:
+        """Returns the local directories the collections are generated from"""
+        return [
+            pathlib.Path(entry.content_path)
+            for entry in self.route_list.values()
+            if isinstance(entry, Collection) and pathlib.Path(getattr(entry, "content_path", "")).is_dir()
+        ]
+
+    def _remove_output(self, output: str | pathlib.Path) -> None:
+        """Deletes an output file that is no longer generated"""
+        logging.info("Removing %s", output)
+        pathlib.Path(output).unlink(missing_ok=True)
+
+    def _prune_outputs(self, outputs: typing.Iterable[str]) -> int:
+        """
+        Removes outputs that weren't written by this build, and the directories they leave empty.
+
+        Paths outside of the `output_path` are never removed. Returns the number of removed files.
+        """
+        output_path = pathlib.Path(self.output_path).resolve()
+        removed = 0
+
+        for output in sorted(outputs):
+            path = pathlib.Path(output).resolve()
+
+            if not path.is_relative_to(output_path) or path == output_path:
+                continue
+
+            self._remove_output(path)
+            removed += 1
+
+            for parent in path.parents:
+                if parent == output_path:
+                    break
+
+                try:
+                    parent.rmdir()
+                except OSError:
+                    break
+
+        return removed
+
+    def _move_output(self, output: str | pathlib.Path, new_output: str | pathlib.Path) -> None:
+        """Moves the output of a renamed source, so an unchanged page doesn't need to be written again"""
+        if pathlib.Path(new_output).exists():
+            return self._remove_output(output)
+
+        logging.info("Moving %s to %s", output, new_output)
+        pathlib.Path(new_output).parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            os.replace(output, new_output)
+        except FileNotFoundError:
+            pass
+
+    def _clean_outputs(
+        self,
+        records: dict[str, dict[str, str] | None],
+        manifest: BuildManifest,
+        changes: ChangeSet,
+    ) -> None:
+        """Removes (or moves) the outputs of the last build that were generated from deleted or renamed sources"""
+        renamed = {os.path.abspath(path): os.path.abspath(new_path) for path, new_path in changes.renamed.items()}
+        removed = {os.path.abspath(path) for path in changes.deleted} | renamed.keys()
+
+        if not removed:
+            return None
+
+        # the output generated from the fewest sources (the page rather than its archives) is moved
+        new_outputs = {}
+
+        for output, inputs in sorted(records.items(), key=lambda item: len(item[1] or ())):
+            for key in inputs or ():
+                if key.startswith("source:") and (path := os.path.abspath(key[7:])) in renamed.values():
+                    new_outputs.setdefault(path, output)
+
+        for output, inputs in manifest.outputs.items():
+            if output in records:
+                continue
+
+            sources = {os.path.abspath(key[7:]) for key in inputs if key.startswith("source:")}
+
+            if sources.isdisjoint(removed):
+                continue
+
+            new_output = next(
+                (new_outputs[renamed[path]] for path in sources if renamed.get(path) in new_outputs),
+                None,
+            )
+
+            if new_output:
+                self._move_output(output, new_output)
+            else:
+                self._remove_output(output)
+
+    def _stale_jobs(
+        self,
+        jobs: list[tuple[list[str], Page]],
+        manifest: BuildManifest,
+        changes: ChangeSet,
+        partial: bool = False,
+        trust_changes: bool = False,
+    ) -> list[tuple[list[str], Page]]:
+        """
+        Records the inputs of every output in the manifest.
+
+        The outputs of the last build that were generated from a deleted (or renamed) source are removed (or moved).
+        Returns every job unless the build is `partial`.
+
+        Partial builds return the jobs whose output is missing or whose inputs changed since the manifest was saved.
+        If `trust_changes` is True, the jobs whose source or template files are in `changes` are returned too,
+        and outputs without a record in the manifest are assumed to be current (unless a python module changed).
+        """
+        outputs = [[str(path) for path in self._output_paths(routes, page)] for routes, page in jobs]
+        self._manifest = manifest
+        self._fingerprints = {}
+        self._fingerprint_jobs = jobs
+        self._fingerprint_outputs = sorted({path for paths in outputs for path in paths})
+        records = {}
+
+        for paths, (_, page) in zip(outputs, jobs):
+            inputs = self._output_inputs(page)
+
+            for path in paths:
+                records.setdefault(path, inputs)
+
+        self._clean_outputs(records, manifest, changes)
+
+        if partial and trust_changes:
+            changed_files = {
+                os.path.abspath(path) for path in (*changes.added, *changes.modified, *changes.renamed.values())
+            }
+            modules = {
+                os.path.abspath(path)
+                for module in list(sys.modules.values())
+                if (path := getattr(module, "__file__", None))
+            }
+            code_changed = not changed_files.isdisjoint(modules)
+            stale = []
+
+            for paths, (routes, page) in zip(outputs, jobs):
+                if not changed_files.isdisjoint(self._output_files(page)) or any(
+                    records[path] is None
+                    or not pathlib.Path(path).exists()
+                    or (path in manifest.outputs and not manifest.is_current(path, records[path]))
+                    or (path not in manifest.outputs and code_changed)
+                    for path in paths
+                ):
+                    stale.append((routes, page))
+
+            jobs = stale
+
+        elif partial:
+            jobs = [
+                job
+                for paths, job in zip(outputs, jobs)
+                if not all(manifest.is_current(path, records[path]) for path in paths)
+            ]
+
+        manifest.outputs = {output: inputs for output, inputs in records.items() if inputs is not None}
+        self._manifest, self._fingerprints, self._fingerprint_jobs = None, {}, []
+        return jobs
+
+    def _compress_outputs(self, manifest: BuildManifest) -> int:
+        """
+        Writes the compressed copies of the text outputs in worker processes.
+
+        Outputs with the same content hash as when they were last compressed are skipped.
+        Returns the number of outputs that were compressed.
+        """
+        paths = sorted(path for path in self._outputs if is_compressible(path))
+        digests = {path: manifest.compressed.get(path) for path in paths}
+        workers = self.compress_workers or os.cpu_count()
+        compressed = 0
+        manifest.compressed = {}
+
+        for path, digest, written in run_in_workers(_compress_job, (paths, digests), len(paths), workers):
+            if digest is None:
+                continue
+
+            manifest.compressed[path] = digest
+            self._outputs.update(compressed_paths(path))
+            compressed += written
+
+        return compressed
+
+    def _prepare_render(self) -> ParseCache | None:
+        """Loads the caches and sets the globals the templates read. Returns the parse cache, if there is one"""
+        self.engine.globals.update(self.site_vars)
+        self._load_bytecode_cache()
+
+        parse_cache = self._load_parse_cache()
+
+        self.engine.globals["site"] = self
+        self.engine.globals["routes"] = self.route_list
+        self.engine.globals["route_index"] = RouteIndex(self.route_list)
+
+        for entry in self.route_list.values():
+            if isinstance(entry, Collection):
+                entry.invalidate_pages()
+
+        return parse_cache
+
+    def render(self, changes: ChangeSet | None = None) -> None:
         """
         Render all pages and collections.
 
@@ -232,42 +714,309 @@ class Site(ThemeManager):
 
         You can choose to call it manually in your file or
         use the CLI command [`render-engine build`][src.render_engine.cli.build]
+
+        If `render_workers` is set, pages are rendered in that many worker processes.
+        The `pre_build_site` and `post_build_site` hooks are still called once, in this process.
+
+        If `changes` are given (like the files changed between two git revisions),
+        the build is partial and those changes are used instead of looking for changed sources.
+
+        params:
+            changes: the source and template files that changed since the last build
         """
+        partial = self.partial or changes is not None
 
         with Progress() as progress:
             pre_build_task = progress.add_task("Loading Pre-Build Plugins", total=1)
             self._pm.hook.pre_build_site(site=self, settings=self.site_settings.get("plugins", {}))  # type: ignore
 
-            self.engine.globals.update(self.site_vars)
-            # Parse Route List
-            task_add_route = progress.add_task("[blue]Adding Routes", total=len(self.route_list))
-
-            self._render_static()
-
-            self.engine.globals["site"] = self
-            self.engine.globals["routes"] = self.route_list
+            parse_cache = self._prepare_render()
+            jobs = self._render_jobs()
+            self._output_pages = {str(path): page for routes, page in jobs for path in self._output_paths(routes, page)}
+            self._outputs = set(self._output_pages)
+
+            manifest = self._load_manifest(partial)
+
+            if self.fingerprint_static:
+                # static files are only hashed again when their modification time or size changes
+                self._asset_hashes = manifest or getattr(self, "_asset_hashes", None) or BuildManifest("")
+                self.engine.globals["assets"] = self._fingerprint_static(self._asset_hashes)
+            else:
+                self.engine.globals["assets"] = {}
+
+            if manifest:
+                trust_changes = changes is not None
+                changes = changes if trust_changes else manifest.scan(self._content_directories())
+                logging.info(
+                    "Changed sources: %d added, %d modified, %d deleted, %d renamed",
+                    len(changes.added),
+                    len(changes.modified),
+                    len(changes.deleted),
+                    len(changes.renamed),
+                )
+                jobs = self._stale_jobs(jobs, manifest, changes, partial, trust_changes)
+
+            task_add_route = progress.add_task("[blue]Adding Routes", total=len(jobs))
+            # streamed pages (like feeds) are rendered while they are written, in this process
+            streamed = [(routes, page) for routes, page in jobs if getattr(page, "stream", False)]
+            jobs = [(routes, page) for routes, page in jobs if not getattr(page, "stream", False)]
+            batches = [
+                jobs[start : start + self.render_batch_size] for start in range(0, len(jobs), self.render_batch_size)
+            ]
+            rendered = flatten(run_in_workers(_render_job, (self, batches), len(batches), self.render_workers))
+
+            # writes are finished (and errors raised) before the post-build plugins run
+            writer = self._writer = OutputWriter(workers=self.write_workers)
+
+            try:
+                # static files are synced in the background while the pages are rendered
+                with writer, ThreadPoolExecutor(max_workers=1) as static_sync:
+                    static_synced = static_sync.submit(self._render_static)
+
+                    for (routes, page), content in zip(jobs, rendered):
+                        progress.update(
+                            task_add_route,
+                            advance=1,
+                            description=f"[blue]Adding[gold]Route: [blue]{page._slug}",
+                        )
+                        page.rendered_content = content
+                        self._write_outputs(self._output_paths(routes, page), content)
 
-            for slug, entry in self.route_list.items():
-                progress.update(task_add_route, description=f"[blue]Adding[gold]Route: [blue]{slug}")
-                if isinstance(entry, Page):
-                    if getattr(entry, "collection", None):
-                        self._pm.hook.render_content(Page=entry, settings=self.site_settings.get("plugins", None))
-                    for route in entry.routes:
+                    for routes, page in streamed:
                         progress.update(
                             task_add_route,
-                            description=f"[blue]Adding[gold]Route: [blue]{entry._slug}",
+                            advance=1,
+                            description=f"[blue]Adding[gold]Route: [blue]{page._slug}",
                         )
-                        self._render_output(route, entry)
+                        self._stream_page(routes, page)
 
-                if isinstance(entry, Collection):
-                    if not self.partial:
-                        self._render_full_collection(entry)
-                    else:
-                        self._render_partial_collection(entry)
+                    if assets := self.engine.globals["assets"]:
+                        self._write_output(
+                            pathlib.Path(self.output_path, self.asset_manifest_path),
+                            json.dumps(assets, indent=2, sort_keys=True),
+                        )
+
+                    static_synced.result()
+            finally:
+                self._writer = None
+                self._outputs.update(str(path) for path in writer.outputs)
+
+            progress.console.print(f"Wrote {writer.written} files. Skipped {writer.skipped} unchanged files.")
 
             progress.add_task("Loading Post-Build Plugins", total=1)
+
+            for entry in self.route_list.values():
+                if isinstance(entry, Collection):
+                    call_hook(
+                        getattr(entry, "_pm", None) or self._pm,
+                        "post_build_collection",
+                        collection=entry,
+                        site=self,
+                        settings=self.site_settings.get("plugins", {}),
+                    )
+
             self._pm.hook.post_build_site(
                 site=self,
                 settings=self.site_settings.get("plugins", {}),
             )
+
+            if self.compress_outputs:
+                compressed = self._compress_outputs(manifest)
+                progress.console.print(f"Compressed {compressed} files.")
             progress.update(pre_build_task, advance=1)
+
+        if manifest:
+            if self.prune_outputs and (removed := self._prune_outputs(manifest.files - self._outputs)):
+                logging.info("Removed %d outputs that were not written by this build", removed)
+
+            manifest.files = self._outputs
+            manifest.save()
+
+        if parse_cache:
+            logging.info("Parse cache: %d hits, %d misses", parse_cache.hits, parse_cache.misses)
+            parse_cache.prune()
+
+    def _reload_collection_page(self, collection: Collection, path: pathlib.Path) -> Page | None:
+        """
+        Parses a changed content file of the collection again and returns its page (`None` if it was deleted).
+
+        The other pages of the collection are kept. Outputs the page no longer writes (like after its slug changed)
+        are removed.
+        """
+        pages = collection.load_pages()
+        content_paths = {content_path.resolve(): content_path for content_path in collection.iter_content_path()}
+        index = next(
+            (
+                index
+                for index, page in enumerate(pages)
+                if getattr(page, "content_path", None) and pathlib.Path(page.content_path).resolve() == path
+            ),
+            None,
+        )
+        old_paths = set(self._output_paths(list(collection.routes), pages[index])) if index is not None else set()
+        page = collection.get_page(content_paths[path]) if path in content_paths else None
+
+        if page is None and index is not None:
+            del pages[index]
+        elif index is not None:
+            pages[index] = page
+        elif page is not None:
+            pages.append(page)
+
+        new_paths = set(self._output_paths(list(collection.routes), page)) if page is not None else set()
+
+        for output in old_paths - new_paths:
+            self._remove_output(output)
+
+            if (outputs := getattr(self, "_outputs", None)) is not None:
+                outputs.discard(str(output))
+
+        return page
+
+    def rebuild(self, paths: typing.Iterable[str | pathlib.Path]) -> int:
+        """
+        Regenerates only the outputs affected by changes to `paths`, reusing the pages kept in memory.
+
+        This is used by `render-engine serve --reload` after the site was rendered once:
+
+        - a collection's content file is parsed again and its page, the collection's archives and feed are rendered
+        - a page's content file is parsed again and the page is rendered
+        - a template renders the pages whose templates load it
+        - a static file is copied (pages using `static_url` are rendered if its fingerprint changed)
+
+        Changes to python modules are not handled, the site has to be loaded and rendered again.
+
+        params:
+            paths: the files that were added, modified or deleted
+
+        Returns the number of pages that were rendered.
+        """
+        jobs: dict[int, tuple[list[str], Page]] = {}
+        changed_collections: dict[int, Collection] = {}
+        templates = set()
+        static_changed = False
+        static_roots = [pathlib.Path(static_path).resolve() for static_path in self.static_paths]
+        template_roots = [root.resolve() for root in loader_paths(self.engine.loader)]
+        self._writer = OutputWriter()
+
+        try:
+            for path in sorted({pathlib.Path(path).resolve() for path in paths}):
+                if any(path.is_relative_to(root) for root in static_roots):
+                    static_changed = True
+                    self._render_static_file(path)
+                    continue
+
+                if names := [path.relative_to(root).as_posix() for root in template_roots if path.is_relative_to(root)]:
+                    templates.update(names)
+                    continue
+
+                for entry in self.route_list.values():
+                    # content paths can also be urls or other sources that the parser understands
+                    if not isinstance(content_path := getattr(entry, "content_path", None), str | pathlib.Path):
+                        continue
+
+                    if isinstance(entry, Collection) and path.is_relative_to(pathlib.Path(content_path).resolve()):
+                        changed_collections[id(entry)] = entry
+
+                        if (page := self._reload_collection_page(entry, path)) is not None:
+                            jobs[id(page)] = (list(entry.routes), page)
+
+                    elif isinstance(entry, Page) and pathlib.Path(content_path).resolve() == path and path.exists():
+                        entry._reload_content()
+                        jobs[id(entry)] = (list(entry.routes), entry)
+
+            if changed_collections:
+                self.engine.globals["route_index"] = RouteIndex(self.route_list)
+
+            for collection in changed_collections.values():
+                pages = {id(page) for page in collection}
+                jobs.update(
+                    (id(page), (routes, page))
+                    for routes, page in self._full_collection_jobs(collection)
+                    if id(page) not in pages
+                )
+
+            assets = self.engine.globals.get("assets") or {}
+
+            if static_changed and self.fingerprint_static:
+                hashes = getattr(self, "_asset_hashes", None) or BuildManifest("")
+                self.engine.globals["assets"] = self._fingerprint_static(hashes)
+
+            if assets_changed := (self.engine.globals.get("assets") or {}) != assets:
+                static_files = self._static_files()
+
+                for path, fingerprinted in self.engine.globals["assets"].items():
+                    if assets.get(path) != fingerprinted:
+                        self._render_static_file(static_files[pathlib.Path(self.output_path, path)])
+
+                self._write_output(
+                    pathlib.Path(self.output_path, self.asset_manifest_path),
+                    json.dumps(self.engine.globals["assets"], indent=2, sort_keys=True),
+                )
+
+            if templates or assets_changed:
+                # the templates may load other templates now
+                self._fingerprints = {}
+
+                for routes, page in self._render_jobs():
+                    dependencies = self._template_dependencies(page)
+
+                    if (
+                        dependencies is None
+                        or dependencies[0].keys() & templates
+                        or (assets_changed and "assets" in dependencies[1])
+                    ):
+                        jobs.setdefault(id(page), (routes, page))
+
+            jobs = list(jobs.values())
+            streamed = [(routes, page) for routes, page in jobs if getattr(page, "stream", False)]
+            rendered = [(routes, page) for routes, page in jobs if not getattr(page, "stream", False)]
+
+            for (routes, page), content in zip(rendered, self._render_batch(rendered)):
+                page.rendered_content = content
+                self._write_outputs(self._output_paths(routes, page), content)
+
+            for routes, page in streamed:
+                self._stream_page(routes, page)
+
+        finally:
+            self._writer = None
+
+        return len(jobs)
+
+
+def _compress_job(state: tuple[list[str], dict[str, str | None]], index: int) -> tuple[str, str | None, bool]:
+    """Compresses an output for `Site._compress_outputs`"""
+    paths, digests = state
+    return compress_file(paths[index], digests[paths[index]])
+
+
+def _public_data(value: typing.Any) -> typing.Any:
+    if isinstance(value, dict):
+        return {key: _public_data(_value) for key, _value in value.items() if not str(key).startswith("_")}
+    return value
+
+
+def _page_data(page: Page) -> dict[str, typing.Any]:
+    """Returns the public, non-callable attributes of the page that templates can read"""
+    data = {}
+
+    for name in dir(page):
+        if name.startswith("_") or name == "rendered_content":
+            continue
+
+        try:
+            value = getattr(page, name)
+        except Exception:
+            continue
+
+        if not callable(value):
+            data[name] = _public_data(value)
+
+    return data
+
+
+def _render_job(state: tuple[Site, list[list[tuple[list[str], Page]]]], index: int) -> list[str]:
+    """Renders a batch of (routes, page) jobs from `Site.render`"""
+    site, batches = state
+    return site._render_batch(batches[index])
@@ -1,10 +1,14 @@
 import dataclasses
+import filecmp
 import logging
+import os
 import pathlib
-import shutil
 
 from jinja2 import BaseLoader, Environment
 
+from .manifest import BuildManifest
+from .writer import OutputWriter
+
 
 @dataclasses.dataclass
 class Theme:
@@ -48,12 +52,21 @@ class ThemeManager:
         static_paths: set of filepaths for static folders.
             This will get copied to the output folder.
             Folders are recursive.
+        static_link_mode: how changed static files are placed in the output folder:
+            `"copy"`, `"hardlink"` or `"reflink"`.
+        fingerprint_static: if True, static files are also written with a hash of their content
+            in their name (`static/app.3f9a1c2b.css`). The `static_url` filter returns the fingerprinted URL.
+        asset_manifest_path: path (relative to the output folder) of the JSON file that maps each static file
+            to its fingerprinted name. Only written if `fingerprint_static` is True.
 
     """
 
     engine: Environment
     output_path: str = "output"
     static_paths: set[str | pathlib.Path] = {"static"}
+    static_link_mode: str = "copy"
+    fingerprint_static: bool = False
+    asset_manifest_path: str = "assets.json"
 
     def register_theme(self, theme: Theme):
         """
@@ -84,11 +97,97 @@ class ThemeManager:
         for theme in themes:
             self.register_theme(theme)
 
-    def _render_static(self) -> None:
-        """Copies a Static Directory to the output folder"""
-        for static_path in self.static_paths:
+    def _static_files(self) -> dict[pathlib.Path, pathlib.Path]:
+        """
+        Returns the static files to copy, keyed by their destination in the output folder.
+
+        Static paths are read in a stable order. When several static paths (like those of overlapping themes)
+        have a file with the same destination, the file is only copied once.
+        """
+        files = {}
+
+        for static_path in sorted(self.static_paths, key=str):
+            if not pathlib.Path(static_path).is_dir():
+                continue
+
             logging.debug(f"Copying Static Files from {static_path}")
-            if pathlib.Path(static_path).exists():
-                shutil.copytree(
-                    static_path, pathlib.Path(self.output_path) / pathlib.Path(static_path).name, dirs_exist_ok=True
-                )
+            pending = [(str(static_path), pathlib.Path(self.output_path) / pathlib.Path(static_path).name)]
+
+            while pending:
+                directory, destination = pending.pop()
+
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir():
+                            pending.append((entry.path, destination / entry.name))
+                            continue
+
+                        dst = destination / entry.name
+
+                        if (src := files.setdefault(dst, pathlib.Path(entry.path))) != pathlib.Path(entry.path):
+                            if not filecmp.cmp(src, entry.path, shallow=False):
+                                logging.warning(f"Static file {entry.path} conflicts with {src}. Copying {src}")
+
+        return files
+
+    def _fingerprint_static(self, hashes: BuildManifest) -> dict[str, str]:
+        """
+        Returns the fingerprinted path of each static file, keyed by its path. Paths are relative to the output folder.
+
+        The hashes are read from (and recorded in) `hashes`, so files are only hashed again when their
+        modification time or size changes.
+        """
+        assets = {}
+        output_path = pathlib.Path(self.output_path)
+
+        for dst, src in self._static_files().items():
+            path = dst.relative_to(output_path)
+            digest = hashes.source_fingerprint(src)[:8]
+            assets[path.as_posix()] = path.with_name(f"{path.stem}.{digest}{path.suffix}").as_posix()
+
+        return assets
+
+    def _render_static(self) -> None:
+        """
+        Copies the Static Directories to the output folder, skipping files that are unchanged.
+
+        Fingerprinted copies are written too when the `assets` global has the fingerprinted paths.
+        """
+        writer = getattr(self, "_writer", None) or OutputWriter()
+        assets = (self.engine.globals.get("assets") or {}) if self.fingerprint_static else {}
+        output_path = pathlib.Path(self.output_path)
+
+        for dst, src in self._static_files().items():
+            writer.copy(src, dst, self.static_link_mode)
+
+            if fingerprinted := assets.get(dst.relative_to(output_path).as_posix()):
+                writer.copy(src, output_path / fingerprinted, self.static_link_mode)
+
+    def _render_static_file(self, path: str | pathlib.Path) -> None:
+        """
+        Copies a single changed static file to the output folder, or removes its copy if it was deleted.
+
+        When several static paths have a file with the same destination, the one `_render_static` copies is used.
+        """
+        path = pathlib.Path(path).resolve()
+        static_paths = [pathlib.Path(static_path) for static_path in sorted(self.static_paths, key=str)]
+
+        if (static_path := next((p for p in static_paths if path.is_relative_to(p.resolve())), None)) is None:
+            return None
+
+        relative = path.relative_to(static_path.resolve())
+        output_path = pathlib.Path(self.output_path)
+        dst = output_path / static_path.name / relative
+        sources = [p / relative for p in static_paths if p.name == static_path.name and (p / relative).is_file()]
+        writer = getattr(self, "_writer", None) or OutputWriter()
+
+        if not sources:
+            logging.info("Removing %s", dst)
+            dst.unlink(missing_ok=True)
+            return None
+
+        writer.copy(sources[0], dst, self.static_link_mode)
+        assets = (self.engine.globals.get("assets") or {}) if self.fingerprint_static else {}
+
+        if fingerprinted := assets.get(dst.relative_to(output_path).as_posix()):
+            writer.copy(sources[0], output_path / fingerprinted, self.static_link_mode)
@@ -0,0 +1,72 @@
+"""Helpers for spreading build work across processes."""
+
+import logging
+import math
+import multiprocessing
+import typing
+from concurrent.futures import ProcessPoolExecutor
+
+from more_itertools import flatten
+
+_state: typing.Any = None
+
+
+def can_fork() -> bool:
+    """Returns True if worker processes can be forked on this platform."""
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def _run_chunk(func: typing.Callable, indexes: range) -> list:
+    return [func(_state, index) for index in indexes]
+
+
+def _iter_results(pool: ProcessPoolExecutor, results: typing.Iterator[list]) -> typing.Generator:
+    global _state
+
+    try:
+        with pool:
+            yield from flatten(results)
+    finally:
+        _state = None
+
+
+def run_in_workers(
+    func: typing.Callable[[typing.Any, int], typing.Any],
+    state: typing.Any,
+    count: int,
+    workers: int | None,
+    chunksize: int | None = None,
+) -> typing.Iterator[typing.Any]:
+    """
+    Returns an iterator of `func(state, index) for index in range(count)`, computed in worker processes.
+
+    The workers are forked from the current process so `state` (the site, collections and pages)
+    is inherited instead of being pickled. Only the indexes are sent to the workers and only the
+    results are sent back. Results are always returned in index order, as soon as they are ready.
+
+    The workers are forked when this is called (not when the results are iterated),
+    so threads started afterwards are not copied into the workers.
+
+    The work is done lazily in the current process when `workers` is less than 2
+    or when the platform does not support forking.
+
+    params:
+        func: A module level function that accepts the `state` and an index
+        state: The object shared with the workers
+        count: The number of indexes
+        workers: The maximum number of worker processes
+        chunksize: The number of indexes sent to a worker at a time
+    """
+    global _state
+
+    if not workers or workers < 2 or count < 2 or not can_fork():
+        if workers and workers > 1 and not can_fork():
+            logging.warning("Forking is not supported on this platform. Running %d jobs serially.", count)
+        return (func(state, index) for index in range(count))
+
+    workers = min(workers, count)
+    chunksize = chunksize or math.ceil(count / (workers * 4))
+    chunks = [range(start, min(start + chunksize, count)) for start in range(0, count, chunksize)]
+    _state = state
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+    return _iter_results(pool, pool.map(_run_chunk, [func] * len(chunks), chunks))
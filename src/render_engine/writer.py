@@ -0,0 +1,339 @@
+"""Write rendered output to disk in the background while the site keeps rendering."""
+
+import filecmp
+import logging
+import os
+import pathlib
+import queue
+import shutil
+import threading
+import typing
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows
+    fcntl = None
+
+_STOP = object()
+FICLONE = 0x40049409
+LINK_MODES = ("hardlink", "reflink", "copy")
+
+
+def _clone(src: pathlib.Path, dst: pathlib.Path) -> None:
+    """Copies `src` to `dst`, sharing the data blocks (a reflink) if the filesystem supports it"""
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        if fcntl:
+            try:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+                return
+            except OSError:
+                pass
+
+        try:
+            # copies inside the kernel (and clones on filesystems that support it)
+            remaining = os.fstat(fsrc.fileno()).st_size
+
+            while remaining > 0 and (copied := os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)):
+                remaining -= copied
+
+            if remaining <= 0:
+                return
+
+        except (AttributeError, OSError):
+            pass
+
+        fsrc.seek(0)
+        fdst.seek(0)
+        fdst.truncate()
+        shutil.copyfileobj(fsrc, fdst)
+
+
+def link_file(src: str | pathlib.Path, dst: str | pathlib.Path, mode: str = "reflink") -> None:
+    """
+    Places the content of `src` at `dst`, replacing `dst` atomically.
+
+    Modes:
+        hardlink: `dst` is another name for `src`. Falls back to a reflink if a hardlink can't be made.
+        reflink: `dst` shares its data with `src` until one of them changes. Falls back to a copy.
+        copy: `dst` is a plain copy of `src`.
+    """
+    if mode not in LINK_MODES:
+        raise ValueError(f"{mode} is not a valid link mode. Use one of {', '.join(LINK_MODES)}")
+
+    dst = pathlib.Path(dst)
+    tmp_dst = dst.with_name(f".{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+    try:
+        if mode == "hardlink":
+            try:
+                os.link(src, tmp_dst)
+            except OSError:
+                mode = "reflink"
+
+        if mode == "reflink":
+            _clone(src, tmp_dst)
+        elif mode == "copy":
+            shutil.copyfile(src, tmp_dst)
+
+        os.replace(tmp_dst, dst)
+
+    finally:
+        tmp_dst.unlink(missing_ok=True)
+
+
+class OutputWriter:
+    """
+    Writes rendered content to disk from a pool of background threads.
+
+    [`write`][src.render_engine.writer.OutputWriter.write] hands the content to a bounded queue
+    and returns immediately (unless the queue is full). The threads drain the queue in batches
+    and only create each output directory once.
+
+    Errors raised while writing are collected and re-raised in the calling thread by
+    [`close`][src.render_engine.writer.OutputWriter.close].
+
+    Files that already have the same content are not written again, so their modification
+    times are preserved and sync tools only transfer the files that changed.
+
+    ```python
+    with OutputWriter(workers=4) as writer:
+        writer.write(pathlib.Path("output/index.html"), "<h1>Hello</h1>")
+    ```
+
+    Attributes:
+        workers: The number of writer threads. If `0`, content is written when `write` is called.
+        queue_size: The number of pending writes before `write` blocks.
+        batch_size: The maximum number of files a thread writes before checking the queue again.
+        written: The number of files that were written.
+        skipped: The number of files that were unchanged and not written.
+        outputs: The paths of every file that was written, copied or found to be unchanged.
+    """
+
+    queue_size: int = 256
+    batch_size: int = 32
+
+    def __init__(self, workers: int = 0, queue_size: int | None = None, batch_size: int | None = None) -> None:
+        self.workers = workers
+        self.queue_size = queue_size or self.queue_size
+        self.batch_size = batch_size or self.batch_size
+        self.errors: list[tuple[pathlib.Path, Exception]] = []
+        self.written = 0
+        self.skipped = 0
+        self.outputs: set[pathlib.Path] = set()
+        self._lock = threading.Lock()
+        self._directories: set[pathlib.Path] = set()
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._threads: list[threading.Thread] = []
+
+    def __enter__(self) -> "OutputWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close(raise_errors=exc_type is None)
+
+    def _mkdir(self, directory: pathlib.Path) -> None:
+        """Creates the directory the first time it is needed"""
+        if directory not in self._directories:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._directories.add(directory)
+
+    def _count(self, written: bool) -> None:
+        with self._lock:
+            if written:
+                self.written += 1
+            else:
+                self.skipped += 1
+
+    def _write(self, path: pathlib.Path, content: str) -> None:
+        """Writes the content unless the file already contains it"""
+        data = content.encode()
+
+        try:
+            if path.exists() and path.stat().st_size == len(data) and path.read_bytes() == data:
+                self._count(written=False)
+                return
+
+            self._mkdir(path.parent)
+            path.write_bytes(data)
+            self._count(written=True)
+
+        except Exception as e:
+            self.errors.append((path, e))
+
+    def _write_many(self, paths: list[pathlib.Path], content: str, mode: str) -> None:
+        """Writes the content to the first path and places it at the other paths"""
+        path, *others = paths
+        errors = len(self.errors)
+        self._write(path, content)
+
+        if len(self.errors) > errors:
+            return
+
+        size = len(data := content.encode())
+
+        for other in others:
+            try:
+                if other.exists() and (
+                    os.path.samefile(path, other)
+                    if mode == "hardlink"
+                    else (other.stat().st_size == size and other.read_bytes() == data)
+                ):
+                    self._count(written=False)
+                    continue
+
+                self._mkdir(other.parent)
+                link_file(path, other, mode)
+                self._count(written=True)
+
+            except Exception as e:
+                self.errors.append((other, e))
+
+    def _copy(self, src: pathlib.Path, dst: pathlib.Path, mode: str = "copy") -> None:
+        """
+        Copies the file (and its modification time) unless the destination has the same size and time.
+
+        Plain copies use `shutil.copy2`, which copies inside the kernel (`sendfile`) where it can.
+        Hardlinks and reflinks are placed with [`link_file`][src.render_engine.writer.link_file].
+        """
+        try:
+            src_stat = os.stat(src)
+
+            try:
+                dst_stat = os.stat(dst)
+            except FileNotFoundError:
+                dst_stat = None
+
+            if dst_stat and (dst_stat.st_size, dst_stat.st_mtime_ns) == (src_stat.st_size, src_stat.st_mtime_ns):
+                self._count(written=False)
+                return
+
+            self._mkdir(pathlib.Path(dst).parent)
+
+            if mode == "copy":
+                shutil.copy2(src, dst)
+            else:
+                link_file(src, dst, mode)
+                os.utime(dst, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+
+            self._count(written=True)
+
+        except Exception as e:
+            self.errors.append((pathlib.Path(dst), e))
+
+    def _drain(self) -> None:
+        """Writes queued content until the writer is closed"""
+        while True:
+            batch = [self._queue.get()]
+
+            while len(batch) < self.batch_size and batch[-1] is not _STOP:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for item in batch:
+                if item is not _STOP:
+                    func, args = item
+                    func(*args)
+                self._queue.task_done()
+
+            if batch[-1] is _STOP:
+                return
+
+    def _submit(self, func: typing.Callable, *args) -> None:
+        if not self.workers:
+            func(*args)
+            self.raise_errors()
+            return
+
+        # threads start on the first write, so render processes forked before that do not inherit them
+        if not self._threads:
+            with self._lock:
+                if not self._threads:
+                    threads = [threading.Thread(target=self._drain, daemon=True) for _ in range(self.workers)]
+
+                    for thread in threads:
+                        thread.start()
+
+                    self._threads = threads
+
+        self._queue.put((func, args))
+
+    def write(self, path: pathlib.Path, content: str) -> None:
+        """Queues the content to be written to `path`"""
+        self.outputs.add(pathlib.Path(path))
+        self._submit(self._write, path, content)
+
+    def write_many(self, paths: list[pathlib.Path], content: str, mode: str = "reflink") -> None:
+        """
+        Queues the content to be written once and placed at every path.
+
+        The content is written to the first path. The other paths are hardlinks, reflinks or copies
+        of it, depending on `mode` (see [`link_file`][src.render_engine.writer.link_file]).
+        """
+        paths = [pathlib.Path(path) for path in paths]
+        self.outputs.update(paths)
+        self._submit(self._write_many, paths, content, mode)
+
+    def copy(self, src: str | pathlib.Path, dst: str | pathlib.Path, mode: str = "copy") -> None:
+        """
+        Queues `src` to be copied to `dst` (as a `"copy"`, `"hardlink"` or `"reflink"`).
+
+        This can be used as the `copy_function` of `shutil.copytree`.
+        """
+        self.outputs.add(pathlib.Path(dst))
+        self._submit(self._copy, src, dst, mode)
+
+    def write_stream(self, path: str | pathlib.Path, chunks: typing.Iterable[str]) -> bool:
+        """
+        Writes the chunks to `path` as they are produced, without holding the whole content in memory.
+
+        Unlike `write`, this writes in the calling thread. The chunks are written to a temporary file
+        that replaces `path` unless `path` already has the same content.
+        Returns True if `path` was written.
+        """
+        path = pathlib.Path(path)
+        self._mkdir(path.parent)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        self.outputs.add(path)
+
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(chunks)
+
+            written = not (path.exists() and filecmp.cmp(tmp_path, path, shallow=False))
+
+            if written:
+                os.replace(tmp_path, path)
+
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        self._count(written)
+        return written
+
+    def raise_errors(self) -> None:
+        """Logs every error raised while writing and re-raises the first one"""
+        if not self.errors:
+            return
+
+        errors, self.errors = self.errors, []
+
+        for path, error in errors:
+            logging.error("Unable to write %s: %s", path, error)
+
+        raise errors[0][1]
+
+    def close(self, raise_errors: bool = True) -> None:
+        """Waits for the queued content to be written and stops the threads"""
+        for _ in self._threads:
+            self._queue.put(_STOP)
+
+        for thread in self._threads:
+            thread.join()
+
+        self._threads = []
+        self.workers = 0
+
+        if raise_errors:
+            self.raise_errors()
@@ -0,0 +1,112 @@
+import importlib.util
+import pathlib
+
+from render_engine.cache import ParseCache, fingerprint, parser_fingerprint
+from render_engine.collection import Collection
+from render_engine.page import Page
+from render_engine.parsers.markdown import MarkdownPageParser
+from render_engine.site import Site
+
+
+def test_fingerprint_is_stable_for_dict_order():
+    """Tests that dictionaries with the same items produce the same fingerprint"""
+    assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+    assert fingerprint("a", "bc") != fingerprint("ab", "c")
+
+
+def test_parse_cache_hits_on_unchanged_file(tmp_path: pathlib.Path):
+    """Tests that a second parse of an unchanged file is served from the cache"""
+    content_file = tmp_path / "test.md"
+    content_file.write_text("---\ntitle: Cached\n---\n# Hello")
+    cache = ParseCache(tmp_path / "cache")
+
+    first = Page(content_path=content_file, Parser=MarkdownPageParser, parse_cache=cache)
+    assert first._content.strip() == "<h1>Hello</h1>"
+    assert (cache.hits, cache.misses) == (0, 2)
+
+    cache = ParseCache(tmp_path / "cache")
+    second = Page(content_path=content_file, Parser=MarkdownPageParser, parse_cache=cache)
+    assert second.title == "Cached"
+    assert second._content.strip() == "<h1>Hello</h1>"
+    assert (cache.hits, cache.misses) == (2, 0)
+
+
+def test_parse_cache_misses_when_file_or_extras_change(tmp_path: pathlib.Path):
+    """Tests that modified content and parser extras are not served from the cache"""
+    content_file = tmp_path / "test.md"
+    content_file.write_text("~~strike~~")
+    cache = ParseCache(tmp_path / "cache")
+
+    page = Page(content_path=content_file, Parser=MarkdownPageParser, parse_cache=cache)
+    page.parser_extras = {}
+    without_extras = page._content
+
+    page.parser_extras = {"markdown_extras": ["strike"]}
+    assert page._content != without_extras
+
+    content_file.write_text("changed")
+    page = Page(content_path=content_file, Parser=MarkdownPageParser, parse_cache=cache)
+    assert page.content == "changed"
+    assert cache.hits == 0
+
+
+def test_parser_fingerprint_changes_with_parser_implementation(tmp_path: pathlib.Path, mocker):
+    """Tests that editing a parser or upgrading the parsing libraries changes the parser's fingerprint"""
+    module_path = tmp_path / "custom_parser.py"
+    module_path.write_text(
+        "from render_engine.parsers.base_parsers import BasePageParser\nclass CustomParser(BasePageParser):\n    pass\n"
+    )
+    spec = importlib.util.spec_from_file_location("custom_parser", module_path)
+    module = importlib.util.module_from_spec(spec)
+    mocker.patch.dict("sys.modules", {"custom_parser": module})
+    spec.loader.exec_module(module)
+
+    parser_fingerprint.cache_clear()
+    original = parser_fingerprint(module.CustomParser)
+    assert parser_fingerprint(module.CustomParser) == original
+
+    module_path.write_text(module_path.read_text() + "# edited\n")
+    parser_fingerprint.cache_clear()
+    edited = parser_fingerprint(module.CustomParser)
+    assert edited != original
+
+    mocker.patch("render_engine.cache._distribution_version", return_value="999")
+    parser_fingerprint.cache_clear()
+    assert parser_fingerprint(module.CustomParser) != edited
+    parser_fingerprint.cache_clear()
+
+
+def test_parse_cache_prune_evicts_oldest_entries(tmp_path: pathlib.Path):
+    """Tests that the cache is pruned to `max_size`"""
+    cache = ParseCache(tmp_path / "cache", max_size=0)
+
+    for value in range(3):
+        cache.set(fingerprint(value), "x" * 100)
+
+    assert cache.prune() == 3
+    assert cache.get(fingerprint(0)) is None
+
+
+def test_site_cache_path_passes_parse_cache_to_collections(tmp_path: pathlib.Path):
+    """Tests that collections use the site's parse cache when `cache_path` is set"""
+    content_path = tmp_path / "content"
+    content_path.mkdir()
+    content_path.joinpath("test.md").write_text("test")
+
+    class CacheSite(Site):
+        cache_path = tmp_path / ".render-engine"
+        output_path = tmp_path / "output"
+
+    site = CacheSite()
+
+    @site.collection
+    class CachedCollection(Collection):
+        content_path = tmp_path / "content"
+
+    site.render()
+    assert site.parse_cache.misses
+
+    site.render()
+    assert site.parse_cache.hits
+    assert site.parse_cache.misses == 0
+    assert (tmp_path / "output" / "page.html").exists()
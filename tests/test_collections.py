@@ -4,6 +4,7 @@ import pluggy
 import pytest
 
 from render_engine.collection import Collection
+from render_engine.feeds import RSSFeed
 from render_engine.page import Page
 from render_engine.parsers import BasePageParser
 
@@ -153,3 +154,70 @@ def test_collection_attrs_pass_to_page(tmp_path, attr: str, attrval: str | list[
     page = collection.get_page()
 
     assert getattr(page, attr) == attrval
+
+
+def test_collection_pages_are_loaded_once(tmp_path: pathlib.Path, mocker):
+    """Tests that iterating, archives and feeds reuse the same pages until they are invalidated"""
+    tmp_dir = tmp_path / "content"
+    tmp_dir.mkdir()
+    tmp_dir.joinpath("test1.md").write_text("test1")
+    tmp_dir.joinpath("test2.md").write_text("test2")
+
+    class BasicCollection(Collection):
+        content_path = tmp_dir
+        has_archive = True
+
+    collection = BasicCollection()
+    get_page = mocker.spy(collection, "get_page")
+
+    pages = list(collection)
+    list(collection.archives)
+    list(collection.sorted_pages)
+    assert get_page.call_count == 2
+    assert list(collection) == pages
+
+    tmp_dir.joinpath("test3.md").write_text("test3")
+    collection.invalidate_pages()
+    assert len(list(collection)) == 3
+    assert get_page.call_count == 5
+
+
+def test_collection_parse_workers_match_serial_load(tmp_path: pathlib.Path):
+    """Tests that pages parsed in worker processes are the same (and in the same order) as a serial load"""
+    tmp_dir = tmp_path / "content"
+    tmp_dir.mkdir()
+
+    for count in range(6):
+        tmp_dir.joinpath(f"test{count}.md").write_text(f"---\ntitle: Test {count}\n---\n# Heading {count}")
+
+    class SerialCollection(Collection):
+        content_path = tmp_dir
+
+    class ParallelCollection(SerialCollection):
+        parse_workers = 2
+
+    serial_pages = list(SerialCollection())
+    parallel_pages = list(ParallelCollection())
+
+    assert [page.title for page in parallel_pages] == [page.title for page in serial_pages]
+    assert [page._content for page in parallel_pages] == [page._content for page in serial_pages]
+
+
+def test_collection_feed_max_items_selects_first_pages_in_sort_order():
+    """Tests that the feed only has the first `feed_max_items` pages in the collection's sort order"""
+
+    class TestCollection(Collection):
+        pages = [type(f"Page{count}", (Page,), {"date": count})() for count in (3, 1, 4, 5, 2)]
+        Feed = RSSFeed
+        sort_by = "date"
+        sort_reverse = True
+        feed_max_items = 3
+
+    collection = TestCollection()
+    assert [page.date for page in collection.feed.pages] == [5, 4, 3]
+
+    collection.sort_reverse = False
+    assert [page.date for page in collection.feed.pages] == [1, 2, 3]
+
+    collection.feed_max_items = None
+    assert len(collection.feed.pages) == 5
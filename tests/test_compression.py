@@ -0,0 +1,38 @@
+import gzip
+
+from render_engine.compression import compress_file, is_compressible
+
+
+def test_compress_file_writes_gzip_copy(tmp_path):
+    """Tests that a deterministic gzip copy is written next to the file"""
+    path = tmp_path / "index.html"
+    path.write_text("<p>test</p>" * 100)
+
+    _, digest, written = compress_file(path)
+    content = (tmp_path / "index.html.gz").read_bytes()
+
+    assert written
+    assert gzip.decompress(content) == path.read_bytes()
+
+    path.write_text("<p>test</p>" * 100)
+    assert compress_file(path) == (str(path), digest, True)
+    assert (tmp_path / "index.html.gz").read_bytes() == content
+
+
+def test_compress_file_skips_unchanged_content(tmp_path):
+    """Tests that the copies aren't written again if the content hash is unchanged"""
+    path = tmp_path / "index.html"
+    path.write_text("test")
+    _, digest, _ = compress_file(path)
+
+    assert compress_file(path, digest) == (str(path), digest, False)
+
+    path.write_text("changed")
+    assert compress_file(path, digest)[2]
+    assert gzip.decompress((tmp_path / "index.html.gz").read_bytes()) == b"changed"
+
+
+def test_is_compressible():
+    assert is_compressible("output/index.html")
+    assert is_compressible("output/rss.xml")
+    assert not is_compressible("output/static/image.png")
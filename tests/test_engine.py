@@ -3,7 +3,7 @@ import datetime
 import jinja2
 import pytest
 
-from render_engine.engine import format_datetime
+from render_engine.engine import format_datetime, precompile_templates, use_bytecode_cache
 
 
 @pytest.mark.parametrize(
@@ -26,3 +26,19 @@ def test_format_datetime(format, override, expected):
         value=datetime.datetime(2023, 9, 27, 14, 0, 0),
         datetime_format=override,
     )
+
+
+def test_precompile_templates_fills_bytecode_cache(tmp_path):
+    """Tests that every listed template is compiled into the bytecode cache"""
+    env = jinja2.Environment(
+        loader=jinja2.ChoiceLoader(
+            [
+                jinja2.DictLoader({"page.html": "{{ title }}", "broken.html": "{% if %}"}),
+                jinja2.FunctionLoader(lambda name: None),
+            ]
+        )
+    )
+    use_bytecode_cache(env, tmp_path / "jinja")
+
+    assert precompile_templates(env) == 1
+    assert isinstance(env.bytecode_cache, jinja2.FileSystemBytecodeCache)
@@ -2,11 +2,13 @@ import datetime
 
 import pluggy
 import pytest
-from jinja2 import StrictUndefined
+from jinja2 import DictLoader, Environment, StrictUndefined, Template
 
+from render_engine.cache import ParseCache, parser_fingerprint
 from render_engine.collection import Collection
 from render_engine.feeds import RSSFeed
 from render_engine.page import Page
+from render_engine.parsers.base_parsers import BasePageParser
 
 pm = pluggy.PluginManager("fake_test")
 
@@ -102,3 +104,88 @@ def test_feed_atom_link(feed_test_site):
         '<atom:link href="http://localhost:8000/testcollection.rss" rel="self" type="application/rss+xml" />'
         in feed_test_site
     )
+
+
+def test_rss_feed_reuses_cached_items(engine, mocker):
+    """Tests that feed items are only rendered again when the item changes"""
+
+    class TestCollection(Collection):
+        Feed = RSSFeed
+        pages = [Page(content=f"---\ntitle: Page {count}\n---\nContent {count}") for count in range(3)]
+        parse_cache = ParseCache()
+
+    collection = TestCollection()
+    render = mocker.spy(Template, "render")
+    rendered_content = collection.feed._render_content(engine=engine)
+
+    assert render.call_count == 3
+    assert "<title>Page 2</title>" in rendered_content
+
+    collection.pages[1].title = "Changed"
+    rendered_content = collection.feed._render_content(engine=engine)
+
+    assert render.call_count == 4
+    assert "<title>Changed</title>" in rendered_content
+    assert "<title>Page 1</title>" not in rendered_content
+
+
+def test_rss_feed_generates_same_content(engine):
+    """Tests that a feed rendered in chunks matches the rendered feed"""
+
+    class TestCollection(Collection):
+        Feed = RSSFeed
+        pages = [Page(content=f"Content {count}") for count in range(3)]
+
+    feed = TestCollection().feed
+    assert "".join(feed._generate_content(engine=engine)) == feed._render_content(engine=engine)
+
+
+def test_rss_feed_items_render_again_when_globals_change():
+    """Tests that cached feed items are not reused when a global that the item template reads changes"""
+    environment = Environment(
+        loader=DictLoader(
+            {
+                "feed.xml": "{% for item in pages %}{{ render_item(item) }}{% endfor %}",
+                "items.xml": "<title>{{ SITE_TITLE }}: {{ item.title }}</title>",
+            }
+        )
+    )
+
+    class TestFeed(RSSFeed):
+        template = "feed.xml"
+        item_template = "items.xml"
+
+    class TestCollection(Collection):
+        Feed = TestFeed
+        pages = [Page(content="---\ntitle: Post\n---\nContent")]
+        parse_cache = ParseCache()
+
+    collection = TestCollection()
+    environment.globals["SITE_TITLE"] = "First"
+    assert collection.feed._render_content(engine=environment) == "<title>First: Post</title>"
+
+    environment.globals["SITE_TITLE"] = "Second"
+    assert collection.feed._render_content(engine=environment) == "<title>Second: Post</title>"
+
+
+def test_rss_feed_items_render_again_when_parser_changes(engine, mocker):
+    """Tests that cached feed items are not reused when the parser's implementation changes"""
+    cache = ParseCache()
+
+    class TestCollection(Collection):
+        Feed = RSSFeed
+        pages = [Page(content="hello")]
+        parse_cache = cache
+
+    assert "<![CDATA[hello]]>" in TestCollection().feed._render_content(engine=engine)
+
+    # an upgraded parsing library with a different output
+    mocker.patch("render_engine.cache._distribution_version", return_value="999")
+    mocker.patch.object(BasePageParser, "parse", return_value="<p>hello</p>")
+    parser_fingerprint.cache_clear()
+
+    class UpgradedCollection(TestCollection):
+        pages = [Page(content="hello")]
+
+    assert "<![CDATA[<p>hello</p>]]>" in UpgradedCollection().feed._render_content(engine=engine)
+    parser_fingerprint.cache_clear()
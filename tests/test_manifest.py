@@ -0,0 +1,76 @@
+import os
+import pathlib
+
+import git
+
+from render_engine.manifest import BuildManifest, ChangeSet
+
+
+def test_manifest_scan_finds_changes_in_nested_directories(tmp_path):
+    """Tests that scanning finds added, modified, deleted and renamed files in every subdirectory"""
+    content_path = tmp_path / "content"
+    content_path.joinpath("nested").mkdir(parents=True)
+    content_path.joinpath("modified.md").write_text("modified")
+    content_path.joinpath("deleted.md").write_text("deleted")
+    content_path.joinpath("nested", "renamed.md").write_text("renamed")
+
+    manifest = BuildManifest(tmp_path / "manifest.json")
+    changes = manifest.scan([content_path])
+    assert len(changes.added) == 3
+    manifest.save()
+
+    manifest = BuildManifest.load(tmp_path / "manifest.json")
+    assert not manifest.scan([content_path])
+
+    content_path.joinpath("modified.md").write_text("changed")
+    content_path.joinpath("deleted.md").unlink()
+    content_path.joinpath("nested", "renamed.md").rename(content_path / "nested" / "moved.md")
+    content_path.joinpath("nested", "added.md").write_text("added")
+
+    changes = manifest.scan([content_path])
+    assert changes.added == {str(content_path / "nested" / "added.md")}
+    assert changes.modified == {str(content_path / "modified.md")}
+    assert changes.deleted == {str(content_path / "deleted.md")}
+    assert changes.renamed == {str(content_path / "nested" / "renamed.md"): str(content_path / "nested" / "moved.md")}
+
+
+def test_manifest_source_fingerprint_only_changes_with_content(tmp_path):
+    """Tests that touching a file doesn't change its fingerprint"""
+    path = tmp_path / "test.md"
+    path.write_text("test")
+    manifest = BuildManifest(tmp_path / "manifest.json")
+    digest = manifest.source_fingerprint(path)
+
+    os.utime(path, ns=(0, 0))
+    assert manifest.source_fingerprint(path) == digest
+    assert not manifest.scan([tmp_path])
+
+    path.write_text("changed")
+    assert manifest.source_fingerprint(path) != digest
+    assert manifest.source_fingerprint(tmp_path / "missing.md") == "missing"
+
+
+def test_change_set_from_git(tmp_path):
+    """Tests that the changes between a revision and HEAD come from the tree diff"""
+    repo = git.Repo.init(tmp_path)
+    author = git.Actor("Test", "test@example.com")
+
+    for name in ("modified.md", "deleted.md", "renamed.md"):
+        tmp_path.joinpath(name).write_text(f"{name}\n" * 10)
+    repo.index.add(["modified.md", "deleted.md", "renamed.md"])
+    first = repo.index.commit("first", author=author, committer=author)
+
+    tmp_path.joinpath("modified.md").write_text("changed")
+    tmp_path.joinpath("added.md").write_text("added")
+    repo.index.remove(["deleted.md"], working_tree=True)
+    repo.index.move(["renamed.md", "moved.md"])
+    repo.index.add(["modified.md", "added.md"])
+    repo.index.commit("second", author=author, committer=author)
+    tmp_path.joinpath("uncommitted.md").write_text("uncommitted")
+
+    changes = ChangeSet.from_git(first.hexsha, tmp_path)
+    root = pathlib.Path(repo.working_tree_dir)
+    assert changes.added == {str(root / "added.md")}
+    assert changes.modified == {str(root / "modified.md")}
+    assert changes.deleted == {str(root / "deleted.md")}
+    assert changes.renamed == {str(root / "renamed.md"): str(root / "moved.md")}
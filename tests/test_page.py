@@ -4,6 +4,7 @@ import jinja2
 import pytest
 
 from render_engine import Page
+from render_engine.parsers.markdown import MarkdownPageParser
 
 
 @pytest.fixture
@@ -70,3 +71,73 @@ def test_rendered_page_from_template_has_attributes():
         template = environment.get_template("test.html")
 
     assert CustomPage()._render_from_template(template=CustomPage.template) == "CustomPage-custompage-/custompage.html"
+
+
+def test_page_content_is_parsed_once(mocker):
+    """Tests that the parsed content is memoized between accesses"""
+
+    class CustomPage(Page):
+        content = "Test Page"
+
+    page = CustomPage()
+    parse = mocker.spy(page.Parser, "parse")
+
+    assert page._content == page._content == "Test Page"
+    assert parse.call_count == 1
+
+
+def test_page_content_memo_invalidates_on_change():
+    """Tests that changing `content` or `parser_extras` parses the content again"""
+    page = Page(content="# Test Page", Parser=MarkdownPageParser)
+    assert "<h1>Test Page</h1>" in page._content
+
+    page.content = "# Changed"
+    assert "<h1>Changed</h1>" in page._content
+
+    page.parser_extras = {"markdown_extras": ["header-ids"]}
+    assert 'id="changed"' in page._content
+
+
+def test_page_content_can_be_replaced():
+    """Tests that a plugin can rewrite the parsed content of a page"""
+    page = Page(content="# Test Page", Parser=MarkdownPageParser)
+    page._content = page._content.replace("Test", "Rewritten")
+
+    assert "<h1>Rewritten Page</h1>" in page._content
+    assert page._render_content() == page._content
+
+
+def test_render_context_matches_to_dict():
+    """Tests that templates see the same variables (and precedence) as the page's `to_dict`"""
+    template = (
+        "{{title}}|{{slug}}|{{url}}|{{path_name}}|{{custom}}|{{overridden}}|{{content}}|{{from_global}}|"
+        "{{ extra }}|{{ content_override is defined }}"
+    )
+    environment = jinja2.Environment(loader=jinja2.DictLoader({"test.html": template}))
+    environment.globals.update({"from_global": "global", "custom": "global"})
+
+    class CustomPage(Page):
+        custom = "attribute"
+        content = "page content"
+        template_vars = {"overridden": "template var", "custom": "template var"}
+
+    page = CustomPage()
+    test_template = environment.get_template("test.html")
+    expected = test_template.render(**{**page.to_dict(), "content": page._content, "extra": "kwarg"})
+
+    assert page._render_from_template(test_template, extra="kwarg") == expected
+    assert expected.startswith("CustomPage|custompage|/custompage.html|custompage.html|template var|template var|")
+
+
+def test_template_errors_propagate():
+    """Tests that the error raised by a template is raised when the page is rendered or generated"""
+    environment = jinja2.Environment(loader=jinja2.DictLoader({"test.html": "{{ title }} {{ 1 / 0 }}"}))
+
+    class CustomPage(Page):
+        template = "test.html"
+
+    with pytest.raises(ZeroDivisionError):
+        CustomPage()._render_content(engine=environment)
+
+    with pytest.raises(ZeroDivisionError):
+        "".join(CustomPage()._generate_content(engine=environment))
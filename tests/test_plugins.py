@@ -1,12 +1,18 @@
+import dataclasses
+import gc
 import logging
+import os
 import pathlib
 import typing
 
 import pytest
 
+from render_engine import hookspecs
 from render_engine.collection import Collection
 from render_engine.hookspecs import hook_impl
 from render_engine.page import Page
+from render_engine.plugins.clean_output import CleanOutput
+from render_engine.plugins.site_map import SiteMap
 from render_engine.site import Site
 
 
@@ -124,3 +130,216 @@ def test_plugin_render_content_runs_from_archive(tmp_path, mocker):
     assert pathlib.Path(tmp_output_path / "page.html").exists()
     assert pathlib.Path(tmp_output_path / "testcollection.html").exists()
     assert mock_render_content.call_count == 2
+
+
+def test_clean_output_only_removes_stale_outputs_after_first_build(tmp_path):
+    """Tests that CleanOutput removes the output path once and then only removes outputs that aren't written again"""
+    tmp_output_path = tmp_path / "output"
+    tmp_output_path.mkdir()
+    tmp_output_path.joinpath("stray.txt").write_text("stray")
+
+    class TestPluginSite(Site):
+        output_path = tmp_output_path
+        cache_path = tmp_path / "cache"
+
+    site = TestPluginSite()
+    site.register_plugins(CleanOutput)
+
+    @site.page
+    class Kept(Page):
+        content = "kept"
+
+    @site.page
+    class Removed(Page):
+        content = "removed"
+
+    site.render()
+    assert not tmp_output_path.joinpath("stray.txt").exists()
+    assert tmp_output_path.joinpath("removed.html").exists()
+
+    tmp_output_path.joinpath("stray.txt").write_text("stray")
+    kept_mtime = tmp_output_path.joinpath("kept.html").stat().st_mtime_ns
+    del site.route_list["removed"]
+    site.render()
+
+    assert not tmp_output_path.joinpath("removed.html").exists()
+    assert tmp_output_path.joinpath("stray.txt").exists()
+    assert tmp_output_path.joinpath("kept.html").stat().st_mtime_ns == kept_mtime
+
+
+def test_pages_in_collection_share_plugin_manager():
+    """Check that the pages of a collection share one plugin manager instead of creating their own"""
+    collection = Collection()
+    collection.register_plugins([FakePlugin])
+
+    assert collection.get_page()._pm is collection.get_page()._pm is collection._pm
+
+
+def test_unhashable_plugins_can_be_registered():
+    """Check that plugins that can't be hashed (like dataclass instances) are registered"""
+
+    @dataclasses.dataclass
+    class DataPlugin:
+        name: str = "data"
+
+    plugin = DataPlugin()
+    collection = Collection()
+    collection.register_plugins([plugin])
+
+    assert collection._pm.is_registered(plugin)
+    assert collection.get_page()._pm is collection._pm
+
+
+def test_plugin_managers_are_released_with_their_site():
+    """Check that the plugin managers of a site that is no longer used (like a reloaded site) are not kept"""
+    ReloadedPlugin = type("ReloadedPlugin", (), {})
+    site = Site()
+    site.register_plugins(ReloadedPlugin)
+
+    @site.collection
+    class Posts(Collection):
+        pages = [Page()]
+
+    assert any(id(ReloadedPlugin) in key for key in hookspecs._plugin_managers)
+
+    del site, Posts
+    gc.collect()
+    assert not any(id(ReloadedPlugin) in key for key in hookspecs._plugin_managers)
+
+
+def test_page_ignoring_plugin_keeps_site_plugins(site: Site):
+    """Check that a page ignoring a plugin doesn't unregister it from the site"""
+
+    @site.page
+    class ignoringPage(Page):
+        ignore_plugins = [
+            FakePlugin,
+        ]
+
+    assert site.route_list["ignoringpage"]._pm.list_name_plugin() == []
+    assert [site._pm.get_name(x) for x in site.plugins] == ["FakePlugin"]
+
+
+class BatchPlugin:
+    """Record the batch hooks that are called"""
+
+    calls = []
+
+    @hook_impl
+    def render_content_batch(pages, settings):
+        BatchPlugin.calls.append(("render_content_batch", len(pages)))
+
+    @hook_impl
+    def post_render_batch(pages, site):
+        BatchPlugin.calls.append(("post_render_batch", len(pages)))
+
+    @hook_impl
+    def post_build_collection(collection, site, settings):
+        BatchPlugin.calls.append(("post_build_collection", collection._slug))
+
+
+def test_batch_hooks_are_called_once_per_batch(tmp_path):
+    """Check that the batch hooks are called once for each batch and post_build_collection once per collection"""
+    tmp_content_path = tmp_path / "content"
+    tmp_content_path.mkdir()
+
+    for count in range(4):
+        tmp_content_path.joinpath(f"test{count}.md").write_text(f"test {count}")
+
+    class TestPluginSite(Site):
+        output_path = tmp_path / "output"
+        render_batch_size = 2
+
+    site = TestPluginSite()
+    site.register_plugins(BatchPlugin)
+
+    @site.page
+    class batchPage(Page):
+        content = "test"
+
+    @site.collection
+    class batchCollection(Collection):
+        content_path = tmp_content_path
+
+    BatchPlugin.calls = []
+    site.render()
+
+    assert BatchPlugin.calls == [
+        ("render_content_batch", 2),
+        ("post_render_batch", 2),
+        ("render_content_batch", 2),
+        ("post_render_batch", 2),
+        ("render_content_batch", 1),
+        ("post_render_batch", 1),
+        ("post_build_collection", "batchcollection"),
+    ]
+
+
+def test_site_map_splits_into_sitemap_index(tmp_path):
+    """Tests that the sitemap is built from the rendered pages and split when it has too many URLs"""
+    about_path = tmp_path / "about.md"
+    about_path.write_text("# About")
+    os.utime(about_path, (0, 0))
+
+    class TestPluginSite(Site):
+        output_path = tmp_path / "output"
+
+    site = TestPluginSite()
+    site.site_settings = {"plugins": {}}
+    site.register_plugins(SiteMap)
+    site.site_settings["plugins"]["SiteMap"] = {**SiteMap.default_settings, "max_urls": 2, "lastmod": True}
+
+    for name in ("first", "second", "third"):
+        site.page(type(name, (Page,), {"content": name}))
+
+    @site.page
+    class About(Page):
+        content_path = about_path
+
+    tmp_path.joinpath("output").mkdir()
+    tmp_path.joinpath("output", "stale.html").write_text("stale")
+    site.render()
+
+    assert not (site.output_path / "sitemap.xml").exists()
+    sitemaps = [site.output_path / "sitemap-1.xml", site.output_path / "sitemap-2.xml"]
+    content = "".join(sitemap.read_text() for sitemap in sitemaps)
+
+    assert content.count("<url>") == 4
+    assert "stale.html" not in content
+    assert "<lastmod>1970-01-01T00:00:00+00:00</lastmod>" in content
+    index = (site.output_path / "sitemap_index.xml").read_text()
+    assert "sitemap-1.xml</loc>" in index and "sitemap-2.xml</loc>" in index
+
+    # building again without changes doesn't write the sitemaps again
+    os.utime(sitemaps[0], (0, 0))
+    site.render()
+    assert sitemaps[0].stat().st_mtime == 0
+    assert not (site.output_path / "sitemap.xml").exists()
+
+    # the sitemap isn't split anymore
+    site.site_settings["plugins"]["SiteMap"]["max_urls"] = 10
+    site.render()
+    assert (site.output_path / "sitemap.xml").read_text().count("<url>") == 4
+    assert not any(sitemap.exists() for sitemap in sitemaps)
+    assert not (site.output_path / "sitemap_index.xml").exists()
+
+
+def test_site_map_writes_single_sitemap(tmp_path):
+    """Tests that a sitemap within the limits is written without an index"""
+
+    class TestPluginSite(Site):
+        output_path = tmp_path / "output"
+
+    site = TestPluginSite()
+    site.site_settings = {"plugins": {}}
+    site.register_plugins(SiteMap)
+
+    @site.page
+    class About(Page):
+        content = "about"
+
+    site.render()
+
+    assert "about.html</loc>" in (site.output_path / "sitemap.xml").read_text()
+    assert "<lastmod>" not in (site.output_path / "sitemap.xml").read_text()
+    assert not (site.output_path / "sitemap_index.xml").exists()
@@ -0,0 +1,54 @@
+import pytest
+
+from render_engine.collection import Collection
+from render_engine.feeds import RSSFeed
+from render_engine.page import Page
+from render_engine.routes import RouteIndex
+
+
+class CustomPage(Page):
+    content = "page"
+
+
+class CustomCollection(Collection):
+    has_archive = True
+    items_per_page = 1
+    pages = [CustomPage(), Page(content="---\ntitle: Other\n---\nother")]
+
+
+def test_route_index_iterates_collection_once(mocker):
+    """Tests that looking up every page of a collection only iterates the collection once"""
+    collection = CustomCollection()
+    index = RouteIndex({"customcollection": collection, "custompage": CustomPage()})
+    iterate = mocker.spy(CustomCollection, "__iter__")
+
+    for _ in range(3):
+        assert index.url_for("customcollection.custompage") == "/custompage.html"
+        assert index.url_for("customcollection.other") == "/other.html"
+
+    assert iterate.call_count == 1
+    assert index.url_for("custompage") == "/custompage.html"
+
+
+def test_route_index_archive_and_feed_urls():
+    """Tests the URLs of a collection's archive pages and feed"""
+
+    class FeedCollection(CustomCollection):
+        Feed = RSSFeed
+
+    index = RouteIndex({"feedcollection": FeedCollection()})
+
+    assert index.url_for("feedcollection") == "/feedcollection.html"
+    assert index.url_for("feedcollection", page=2) == "/feedcollection2.html"
+    assert index.feed_url("feedcollection") == "/feedcollection.rss"
+
+
+def test_route_index_raises_for_unknown_routes():
+    """Tests that unknown routes raise a ValueError"""
+    index = RouteIndex({"customcollection": CustomCollection()})
+
+    with pytest.raises(ValueError):
+        index.url_for("missing")
+
+    with pytest.raises(ValueError):
+        index.url_for("customcollection.missing")
@@ -1,10 +1,16 @@
+import gzip
+import json
+import os
 import pathlib
 
 import pluggy
 import pytest
 from jinja2 import FileSystemLoader
 
+from render_engine.blog import Blog
 from render_engine.collection import Collection
+from render_engine.feeds import RSSFeed
+from render_engine.manifest import ChangeSet
 from render_engine.page import Page
 from render_engine.site import Site
 
@@ -293,3 +299,414 @@ def test_site_theme_update_settings():
     assert "test" not in site.site_vars
     site.update_theme_settings(test="test")
     assert site.site_vars["theme"]["test"] == "test"
+
+
+def test_site_render_workers_match_serial_render(tmp_path):
+    """Tests that rendering pages in worker processes writes the same files as a serial render"""
+    content_path = tmp_path / "content"
+    content_path.mkdir()
+
+    for count in range(5):
+        content_path.joinpath(f"test{count}.md").write_text(f"---\ntitle: Test {count}\n---\n# Heading {count}")
+
+    outputs = {}
+
+    for render_workers in (None, 2):
+
+        class CustomSite(Site):
+            output_path = tmp_path / f"output{render_workers}"
+
+        site = CustomSite()
+        site.render_workers = render_workers
+
+        @site.page
+        class CustomPage(Page):
+            content = "this is a test"
+            routes = ["./", "other"]
+
+        @site.collection
+        class CustomCollection(Collection):
+            content_path = tmp_path / "content"
+
+        site.render()
+        outputs[render_workers] = {
+            path.relative_to(site.output_path): path.read_text() for path in site.output_path.rglob("*.html")
+        }
+
+    assert len(outputs[2]) == 7
+    assert outputs[2] == outputs[None]
+
+
+def test_site_partial_render_only_renders_outputs_with_changed_inputs(tmp_path, mocker):
+    """Tests that a partial build only renders the outputs whose content, templates or globals changed"""
+    templates_path = tmp_path / "templates"
+    templates_path.mkdir()
+    templates_path.joinpath("partial_base.html").write_text("{{ AUTHOR }}{% block body %}{% endblock %}")
+    templates_path.joinpath("partial_page.html").write_text(
+        '{% extends "partial_base.html" %}{% block body %}{{ content }}{% endblock %}'
+    )
+    content_path = tmp_path / "content"
+    content_path.mkdir()
+
+    for count in range(3):
+        content_path.joinpath(f"test{count}.md").write_text(f"---\ntitle: Test {count}\n---\n# Heading {count}")
+
+    class CustomSite(Site):
+        output_path = tmp_path / "output"
+        cache_path = tmp_path / "cache"
+        template_path = templates_path
+        partial = True
+
+    site = CustomSite()
+    site.site_vars = {**Site.site_vars, "AUTHOR": "Jay"}
+
+    @site.page
+    class CustomPage(Page):
+        content = "this is a test"
+
+    @site.collection
+    class CustomCollection(Collection):
+        content_path = tmp_path / "content"
+        template = "partial_page.html"
+
+    render_page = mocker.spy(site, "_render_page")
+
+    def rendered_paths():
+        paths = {call.args[1].path_name for call in render_page.call_args_list}
+        render_page.reset_mock()
+        return paths
+
+    site.render()
+    assert rendered_paths() == {"custompage.html", "test-0.html", "test-1.html", "test-2.html"}
+
+    site.render()
+    assert rendered_paths() == set()
+
+    content_path.joinpath("test1.md").write_text("---\ntitle: Test 1\n---\n# New Heading")
+    site.render()
+    assert rendered_paths() == {"test-1.html"}
+    assert "New Heading" in (site.output_path / "test-1.html").read_text()
+
+    templates_path.joinpath("partial_base.html").write_text("By {{ AUTHOR }}{% block body %}{% endblock %}")
+    site.render()
+    assert rendered_paths() == {"test-0.html", "test-1.html", "test-2.html"}
+
+    site.site_vars = {**site.site_vars, "AUTHOR": "Kay"}
+    site.render()
+    assert rendered_paths() == {"test-0.html", "test-1.html", "test-2.html"}
+    assert (site.output_path / "test-0.html").read_text().startswith("By Kay")
+
+
+def test_site_cached_templates_use_current_globals(tmp_path):
+    """Tests that filters reading globals aren't evaluated into the cached templates"""
+    templates_path = tmp_path / "templates"
+    templates_path.mkdir()
+    templates_path.joinpath("links.html").write_text("{{ '/x.html' | to_absolute }} {{ 'about' | url_for }}")
+
+    class CustomSite(Site):
+        output_path = tmp_path / "output"
+        cache_path = tmp_path / "cache"
+        template_path = templates_path
+        partial = True
+
+    site = CustomSite()
+    site.site_vars = {**site.site_vars, "SITE_URL": "https://a.example"}
+
+    @site.page
+    class About(Page):
+        content = "about"
+
+    @site.page
+    class Links(Page):
+        template = "links.html"
+
+    site.render()
+    assert (site.output_path / "links.html").read_text() == "https://a.example/x.html /about.html"
+
+    # a new build loads the compiled templates from the bytecode cache
+    site.engine.cache.clear()
+    site.site_vars = {**site.site_vars, "SITE_URL": "https://b.example"}
+    site.route_list["about"].routes = ["docs"]
+    site.render()
+    assert (site.output_path / "links.html").read_text() == "https://b.example/x.html /docs/about.html"
+
+
+def test_site_partial_render_renders_pages_reading_routes_when_pages_change(tmp_path):
+    """Tests that pages listing other pages through the `routes` global are rendered when those pages change"""
+    templates_path = tmp_path / "templates"
+    templates_path.mkdir()
+    templates_path.joinpath("latest.html").write_text(
+        "{% for post in routes['posts'].latest(1) %}{{ post.title }}{% endfor %}"
+    )
+    content_path = tmp_path / "content"
+    content_path.mkdir()
+
+    for count in range(2):
+        content_path.joinpath(f"post{count}.md").write_text(
+            f"---\ntitle: Post {count}\ndate: 2023-01-0{count + 1} 00:00:00+00:00\n---\nPost"
+        )
+
+    class CustomSite(Site):
+        output_path = tmp_path / "output"
+        cache_path = tmp_path / "cache"
+        template_path = templates_path
+        partial = True
+
+    site = CustomSite()
+
+    @site.page
+    class Latest(Page):
+        template = "latest.html"
+
+    @site.collection
+    class Posts(Blog):
+        content_path = tmp_path / "content"
+
+    site.render()
+    assert (site.output_path / "latest.html").read_text() == "Post 1"
+
+    content_path.joinpath("post0.md").write_text("---\ntitle: Post 0\ndate: 2023-01-03 00:00:00+00:00\n---\nPost")
+    site.render()
+    assert (site.output_path / "latest.html").read_text() == "Post 0"
+
+
+def test_site_removes_outputs_of_deleted_sources(tmp_path):
+    """Tests that the output of a deleted content file is removed by the next build"""
+    content_path = tmp_path / "content"
+    content_path.mkdir()
+
+    for count in range(2):
+        content_path.joinpath(f"test{count}.md").write_text(f"---\ntitle: Test {count}\n---\n# Heading {count}")
+
+    class CustomSite(Site):
+        output_path = tmp_path / "output"
+        cache_path = tmp_path / "cache"
+
+    site = CustomSite()
+
+    @site.collection
+    class CustomCollection(Collection):
+        content_path = tmp_path / "content"
+
+    site.render()
+    assert (site.output_path / "test-1.html").exists()
+
+    content_path.joinpath("test1.md").unlink()
+    site.render()
+    assert not (site.output_path / "test-1.html").exists()
+    assert (site.output_path / "test-0.html").exists()
+
+
+def test_site_render_with_changes_only_renders_changed_files(tmp_path, mocker):
+    """Tests that a build given the changed files renders their outputs and moves the outputs of renamed files"""
+    content_path = tmp_path / "content"
+    content_path.mkdir()
+
+    for count in range(3):
+        content_path.joinpath(f"test{count}.md").write_text(f"---\ntitle: Test {count}\n---\n# Heading {count}")
+
+    class CustomSite(Site):
+        output_path = tmp_path / "output"
+        cache_path = tmp_path / "cache"
+
+    site = CustomSite()
+
+    @site.collection
+    class CustomCollection(Collection):
+        content_path = tmp_path / "content"
+
+    site.render()
+    render_page = mocker.spy(site, "_render_page")
+
+    content_path.joinpath("test0.md").write_text("---\ntitle: Test 0\n---\n# New Heading")
+    content_path.joinpath("test1.md").rename(content_path / "moved.md")
+    content_path.joinpath("moved.md").write_text("---\ntitle: Moved\n---\n# Heading 1")
+    site.render(
+        changes=ChangeSet(
+            modified={str(content_path / "test0.md")},
+            renamed={str(content_path / "test1.md"): str(content_path / "moved.md")},
+        )
+    )
+
+    assert {call.args[1].path_name for call in render_page.call_args_list} == {"test-0.html", "moved.html"}
+    assert not (site.output_path / "test-1.html").exists()
+    assert (site.output_path / "moved.html").exists()
+    assert (site.output_path / "test-2.html").exists()
+
+
+def test_site_renders_page_once_for_every_route(tmp_path, mocker):
+    """Tests that a page with several routes is rendered once and written to every route"""
+
+    class CustomSite(Site):
+        output_path = tmp_path / "output"
+
+    site = CustomSite()
+    site.route_link_mode = "hardlink"
+
+    @site.page
+    class CustomPage(Page):
+        content = "this is a test"
+        routes = ["./", "other", "another"]
+
+    render_page = mocker.spy(site, "_render_page")
+    site.render()
+
+    assert render_page.call_count == 1
+    paths = [site.output_path / route / "custompage.html" for route in ("", "other", "another")]
+    assert [path.read_text() for path in paths] == ["this is a test"] * 3
+    assert paths[0].samefile(paths[2])
+
+
+def test_site_fingerprints_static_files(tmp_path):
+    """Tests that static files are copied to fingerprinted paths that the `static_url` filter returns"""
+    templates_path = tmp_path / "templates"
+    templates_path.mkdir()
+    templates_path.joinpath("fingerprint_page.html").write_text(
+        "{{ 'static/app.css' | static_url }} {{ '/static/other.txt' | static_url }}"
+    )
+    static_path = tmp_path / "static"
+    static_path.mkdir()
+    static_path.joinpath("app.css").write_text("body {}")
+
+    class CustomSite(Site):
+        output_path = tmp_path / "output"
+        template_path = templates_path
+        static_paths = {static_path}
+        fingerprint_static = True
+
+    site = CustomSite()
+
+    @site.page
+    class CustomPage(Page):
+        template = "fingerprint_page.html"
+
+    site.render()
+
+    url, other_url = (site.output_path / "custompage.html").read_text().split()
+    assert url.startswith("/static/app.") and url.endswith(".css") and url != "/static/app.css"
+    assert other_url == "/static/other.txt"
+    assert (site.output_path / url.lstrip("/")).read_text() == "body {}"
+    assert (site.output_path / "static" / "app.css").read_text() == "body {}"
+    assert json.loads((site.output_path / "assets.json").read_text()) == {"static/app.css": url.lstrip("/")}
+
+    static_path.joinpath("app.css").write_text("body { color: red }")
+    site.render()
+
+    new_url = (site.output_path / "custompage.html").read_text().split()[0]
+    assert new_url != url
+    assert (site.output_path / new_url.lstrip("/")).read_text() == "body { color: red }"
+
+
+def test_site_compresses_changed_outputs(tmp_path):
+    """Tests that compressed copies of the outputs are written and only updated when the output changes"""
+
+    class CustomSite(Site):
+        output_path = tmp_path / "output"
+        cache_path = tmp_path / "cache"
+        compress_outputs = True
+        compress_workers = 2
+
+    site = CustomSite()
+
+    @site.page
+    class CustomPage(Page):
+        content = "this is a test"
+
+    @site.page
+    class OtherPage(Page):
+        content = "this is another test"
+
+    site.render()
+
+    gzip_path = site.output_path / "custompage.html.gz"
+    assert gzip.decompress(gzip_path.read_bytes()) == b"this is a test"
+    assert gzip.decompress((site.output_path / "otherpage.html.gz").read_bytes()) == b"this is another test"
+
+    os.utime(gzip_path, ns=(0, 0))
+    site.render()
+    assert gzip_path.stat().st_mtime_ns == 0
+
+    site.route_list["custompage"].content = "this changed"
+    site.render()
+    assert gzip.decompress(gzip_path.read_bytes()) == b"this changed"
+    assert (site.output_path / "otherpage.html.gz").exists()
+
+
+def test_site_streams_feed_to_disk(tmp_path):
+    """Tests that feeds are written as they are rendered and match the rendered feed"""
+
+    class CustomSite(Site):
+        output_path = tmp_path / "output"
+
+    site = CustomSite()
+
+    @site.collection
+    class Posts(Collection):
+        Feed = RSSFeed
+        pages = [Page(content=f"---\ntitle: Post {count}\n---\nContent {count}") for count in range(3)]
+        feed_max_items = 2
+
+    site.render()
+
+    feed = site.route_list["posts"].feed
+    content = (site.output_path / "posts.rss").read_text()
+    assert content == feed._render_content(engine=site.engine)
+    assert content.count("<item>") == 2
+
+
+def test_site_rebuild_only_renders_affected_outputs(tmp_path, mocker):
+    """Tests that rebuilding after a change only renders the outputs that depend on the changed file"""
+    templates_path = tmp_path / "templates"
+    templates_path.mkdir()
+    templates_path.joinpath("rebuild_post.html").write_text("post: {{ content }}")
+    templates_path.joinpath("rebuild_about.html").write_text("about")
+    content_path = tmp_path / "content"
+    content_path.mkdir()
+    static_path = tmp_path / "static"
+    static_path.mkdir()
+    static_path.joinpath("style.css").write_text("body {}")
+
+    for count in range(3):
+        content_path.joinpath(f"post{count}.md").write_text(f"---\ntitle: Post {count}\n---\nContent {count}")
+
+    class CustomSite(Site):
+        output_path = tmp_path / "output"
+        template_path = templates_path
+        static_paths = {static_path}
+
+    site = CustomSite()
+
+    @site.collection
+    class Posts(Collection):
+        content_path = tmp_path / "content"
+        template = "rebuild_post.html"
+        Feed = RSSFeed
+
+    @site.page
+    class About(Page):
+        template = "rebuild_about.html"
+
+    site.render()
+    render_page = mocker.spy(site, "_render_page")
+
+    content_path.joinpath("post1.md").write_text("---\ntitle: Post 1\n---\nChanged")
+    assert site.rebuild([content_path / "post1.md"]) == 2
+    assert (site.output_path / "post-1.html").read_text() == "post: <p>Changed</p>\n"
+    assert "Changed" in (site.output_path / "posts.rss").read_text()
+    assert [call.args[1]._slug for call in render_page.call_args_list] == ["post-1"]
+
+    content_path.joinpath("post2.md").unlink()
+    content_path.joinpath("post3.md").write_text("---\ntitle: Post 3\n---\nNew")
+    site.rebuild([content_path / "post2.md", content_path / "post3.md"])
+    assert not (site.output_path / "post-2.html").exists()
+    assert (site.output_path / "post-3.html").exists()
+    assert "Post 2" not in (site.output_path / "posts.rss").read_text()
+
+    render_page.reset_mock()
+    templates_path.joinpath("rebuild_about.html").write_text("changed about")
+    assert site.rebuild([templates_path / "rebuild_about.html"]) == 1
+    assert (site.output_path / "about.html").read_text() == "changed about"
+
+    static_path.joinpath("style.css").write_text("body { color: red }")
+    assert site.rebuild([static_path / "style.css"]) == 0
+    assert (site.output_path / "static" / "style.css").read_text() == "body { color: red }"
@@ -2,6 +2,7 @@ from jinja2.environment import Environment
 from jinja2.loaders import ChoiceLoader, DictLoader
 
 from render_engine.themes import Theme, ThemeManager
+from render_engine.writer import OutputWriter
 
 
 def test_ThemeManager_builds():
@@ -37,3 +38,29 @@ def test_ThemeManager_registers_theme():
     assert thememgr.engine.get_or_select_template("test2.html").render(test="test") == "This is a TEST"
     assert "test3.html" in thememgr.engine.list_templates()
     assert thememgr.engine.get_or_select_template("test3.html").render(test="test") == "This is a test"
+
+
+def test_ThemeManager_syncs_overlapping_static_dirs_once(tmp_path, mocker):
+    """Tests that files from overlapping static dirs are copied once and unchanged files are skipped"""
+    for theme in ("theme1", "theme2"):
+        tmp_path.joinpath(theme, "static", "fonts").mkdir(parents=True)
+        tmp_path.joinpath(theme, "static", "fonts", "font.woff").write_text("font")
+    tmp_path.joinpath("theme2", "static", "theme2.css").write_text("css")
+
+    class TestThemeManager(ThemeManager):
+        engine = Environment(loader=ChoiceLoader([]))
+        output_path = tmp_path / "output"
+        static_paths = {tmp_path / "theme1" / "static", tmp_path / "theme2" / "static"}
+        static_link_mode = "hardlink"
+
+    thememgr = TestThemeManager()
+    copy = mocker.spy(OutputWriter, "_copy")
+    thememgr._render_static()
+
+    assert copy.call_count == 2
+    assert (tmp_path / "output" / "static" / "fonts" / "font.woff").read_text() == "font"
+    assert (tmp_path / "output" / "static" / "theme2.css").samefile(tmp_path / "theme2" / "static" / "theme2.css")
+
+    write = mocker.spy(OutputWriter, "_count")
+    thememgr._render_static()
+    assert [call.kwargs["written"] for call in write.call_args_list] == [False, False]
@@ -0,0 +1,90 @@
+import pathlib
+
+import pytest
+
+from render_engine.writer import OutputWriter, link_file
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_output_writer_writes_files(tmp_path: pathlib.Path, workers: int):
+    """Tests that every queued file is written when the writer is closed"""
+    with OutputWriter(workers=workers, queue_size=2, batch_size=3) as writer:
+        for count in range(10):
+            writer.write(tmp_path / f"dir{count % 3}" / f"test{count}.html", f"test{count}")
+
+    assert sorted(path.read_text() for path in tmp_path.rglob("*.html")) == sorted(f"test{x}" for x in range(10))
+
+
+def test_output_writer_raises_errors_on_close(tmp_path: pathlib.Path):
+    """Tests that an error raised in a writer thread is raised by close"""
+    tmp_path.joinpath("not_a_directory").write_text("test")
+    writer = OutputWriter(workers=2)
+    writer.write(tmp_path / "not_a_directory" / "test.html", "test")
+
+    with pytest.raises(OSError):
+        writer.close()
+
+
+def test_output_writer_skips_unchanged_files(tmp_path: pathlib.Path):
+    """Tests that files with the same content are not rewritten"""
+    path = tmp_path / "test.html"
+    path.write_text("test")
+    mtime = path.stat().st_mtime_ns
+
+    with OutputWriter() as writer:
+        writer.write(path, "test")
+        writer.write(tmp_path / "new.html", "new")
+
+    assert path.stat().st_mtime_ns == mtime
+    assert (writer.written, writer.skipped) == (1, 1)
+
+
+def test_output_writer_copy_skips_unchanged_files(tmp_path: pathlib.Path):
+    """Tests that copies are skipped when the destination has the same size and modification time"""
+    src = tmp_path / "src.txt"
+    src.write_text("test")
+    dst = tmp_path / "output" / "dst.txt"
+
+    with OutputWriter() as writer:
+        writer.copy(src, dst)
+        writer.copy(src, dst)
+
+    assert dst.read_text() == "test"
+    assert (writer.written, writer.skipped) == (1, 1)
+
+
+@pytest.mark.parametrize("mode", ["hardlink", "reflink", "copy"])
+def test_output_writer_write_many_places_content_at_every_path(tmp_path: pathlib.Path, mode):
+    """Tests that content written to several paths is written once and placed at the others"""
+    paths = [tmp_path / "index.html", tmp_path / "other" / "index.html", tmp_path / "another" / "index.html"]
+
+    with OutputWriter(workers=2) as writer:
+        writer.write_many(paths, "test", mode)
+
+    assert [path.read_text() for path in paths] == ["test"] * 3
+    assert (writer.written, writer.skipped) == (3, 0)
+    assert (paths[0].stat().st_ino == paths[1].stat().st_ino) is (mode == "hardlink")
+
+    with OutputWriter() as writer:
+        writer.write_many(paths, "test", mode)
+
+    assert (writer.written, writer.skipped) == (0, 3)
+
+
+def test_link_file_rejects_unknown_modes(tmp_path: pathlib.Path):
+    """Tests that only the supported link modes are accepted"""
+    with pytest.raises(ValueError):
+        link_file(tmp_path / "src", tmp_path / "dst", "symlink")
+
+
+def test_output_writer_write_stream_skips_unchanged_files(tmp_path: pathlib.Path):
+    """Tests that streamed chunks are written to the file and an unchanged file is left alone"""
+    path = tmp_path / "nested" / "sitemap.xml"
+    writer = OutputWriter()
+
+    assert writer.write_stream(path, (f"<url>{count}</url>" for count in range(3)))
+    assert path.read_text() == "<url>0</url><url>1</url><url>2</url>"
+
+    assert not writer.write_stream(path, iter(["<url>0</url><url>1</url>", "<url>2</url>"]))
+    assert (writer.written, writer.skipped) == (1, 1)
+    assert list(path.parent.iterdir()) == [path]
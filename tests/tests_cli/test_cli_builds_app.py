@@ -1,5 +1,6 @@
 import pytest
 import typer
+from typer.testing import CliRunner
 
 from render_engine.cli import cli
 
@@ -110,3 +111,21 @@ def tests_project_folder_not_exists_error():
             owner_email="foo",
             owner_name="foo",
         )
+
+
+def test_serve_options():
+    """Asserts the serve command's options can be parsed"""
+    result = CliRunner().invoke(cli.app, ["serve", "--help"])
+    assert result.exit_code == 0
+    assert "--quiet-window" in result.output
+
+
+def test_build_jobs_overrides_site_render_workers(mocker):
+    """Asserts `--jobs` sets the render workers even if the site sets them"""
+    site = cli.Site()
+    site.render_workers = 2
+    mocker.patch.object(site, "render")
+    mocker.patch.object(cli, "get_app", return_value=site)
+
+    cli.build(("app", "app"), cache=False, jobs=4)
+    assert site.render_workers == 4
@@ -0,0 +1,170 @@
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from watchdog.events import FileModifiedEvent, FileOpenedEvent
+
+from render_engine.cli.event import (
+    OnDemandRenderer,
+    RebuildWorker,
+    RegExHandler,
+    site_paths,
+    spawn_on_demand_server,
+)
+from render_engine.collection import Collection
+from render_engine.page import Page
+from render_engine.plugins.clean_output import CleanOutput
+from render_engine.site import Site
+
+
+def _site(tmp_path):
+    for folder in ("content", "templates", "static", "output"):
+        tmp_path.joinpath(folder).mkdir()
+    tmp_path.joinpath("about.md").write_text("# About")
+
+    class WatchedSite(Site):
+        output_path = tmp_path / "output"
+        template_path = tmp_path / "templates"
+        static_paths = {tmp_path / "static"}
+
+    site = WatchedSite()
+
+    @site.collection
+    class Posts(Collection):
+        content_path = tmp_path / "content"
+
+    @site.page
+    class About(Page):
+        content_path = tmp_path / "about.md"
+
+    return site
+
+
+def test_rebuild_worker_coalesces_changes():
+    """Tests that a burst of changes triggers a single rebuild with every changed path"""
+    rebuilt = threading.Event()
+    calls = []
+
+    def rebuild(changes):
+        calls.append(changes)
+        rebuilt.set()
+
+    worker = RebuildWorker(rebuild, quiet_window=0.05)
+    worker.start()
+
+    for path in ("a.md", "a.md", "b.md", "a.md"):
+        worker.request(path)
+
+    assert rebuilt.wait(2)
+    worker.stop()
+    assert calls == [{"a.md", "b.md"}]
+
+
+def test_site_paths_only_returns_site_sources(tmp_path):
+    """Tests that the content, template and static paths are watched but not the output path"""
+    site = _site(tmp_path)
+    directories, files = site_paths(site, str(tmp_path / "app.py"))
+
+    assert {tmp_path / "content", tmp_path / "templates", tmp_path / "static"} <= set(directories)
+    assert tmp_path / "output" not in directories
+    assert files == [tmp_path / "about.md"]
+
+
+def test_handler_ignores_output_and_reads(tmp_path, mocker):
+    """Tests that writes to the output path and reads don't request a rebuild"""
+    site = _site(tmp_path)
+    handler = RegExHandler(("127.0.0.1", 8000), str(tmp_path / "output"), site, ("app", "app"))
+    request = mocker.patch.object(handler._rebuilds, "request")
+
+    handler.dispatch(FileModifiedEvent(str(tmp_path / "output" / "index.html")))
+    handler.dispatch(FileOpenedEvent(str(tmp_path / "content" / "post.md")))
+    handler.dispatch(FileModifiedEvent(str(tmp_path / "unrelated.txt")))
+    request.assert_not_called()
+
+    handler.dispatch(FileModifiedEvent(str(tmp_path / "content" / "post.md")))
+    handler.dispatch(FileModifiedEvent(str(tmp_path / "about.md")))
+    assert [call.args[0] for call in request.call_args_list] == [
+        str(tmp_path / "content" / "post.md"),
+        str(tmp_path / "about.md"),
+    ]
+
+
+def test_handler_rebuilds_changed_paths_without_reloading(tmp_path, mocker):
+    """Tests that content changes are rebuilt in place and only module changes reload the site"""
+    site = _site(tmp_path)
+    handler = RegExHandler(("127.0.0.1", 8000), str(tmp_path / "output"), site, ("app", "app"))
+    rebuild = mocker.patch.object(site, "rebuild", return_value=1)
+    reload = mocker.patch("importlib.reload")
+    mocker.patch.object(handler, "_module_path", return_value=str(tmp_path / "app.py"))
+
+    handler.rebuild({str(tmp_path / "about.md")})
+    rebuild.assert_called_once_with({str(tmp_path / "about.md")})
+    reload.assert_not_called()
+
+    mocker.patch("importlib.import_module")
+    mocker.patch.object(handler, "_update_watched_paths")
+    reloaded_site = reload.return_value.app = mocker.Mock()
+    handler.rebuild({str(tmp_path / "app.py")})
+    reloaded_site.render.assert_called_once()
+    assert handler.app is reloaded_site
+
+
+def test_on_demand_renderer_renders_requested_pages_in_memory(tmp_path):
+    """Tests that requested pages are rendered without writing the output path and static files are read in place"""
+    site = _site(tmp_path)
+    tmp_path.joinpath("content", "post.md").write_text("---\ntitle: Post\n---\nHello")
+    tmp_path.joinpath("static", "style.css").write_text("body {}")
+    renderer = OnDemandRenderer(site, cache_size=1)
+
+    name, content = renderer.render("/post.html?ref=1")
+    assert name == "post.html"
+    assert "Hello" in content
+    assert renderer.render("/about.html")[0] == "about.html"
+    assert list(renderer._responses) == ["about.html"]
+    assert renderer.render("/missing.html") is None
+    assert renderer.render("/../about.html") is None
+
+    assert renderer.static_file("/static/style.css") == tmp_path / "static" / "style.css"
+    assert renderer.static_file("/static/missing.css") is None
+    assert not any(tmp_path.joinpath("output").iterdir())
+
+
+def test_on_demand_server_serves_pages_and_static_files(tmp_path):
+    """Tests that the on demand server responds with rendered pages, static files and 404s"""
+    site = _site(tmp_path)
+    tmp_path.joinpath("static", "style.css").write_text("body {}")
+    server = spawn_on_demand_server(("127.0.0.1", 0), OnDemandRenderer(site))
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        with urllib.request.urlopen(f"{url}/about.html") as response:
+            assert response.headers["Content-type"] == "text/html"
+            assert "About" in response.read().decode()
+
+        with urllib.request.urlopen(f"{url}/static/style.css") as response:
+            assert response.read() == b"body {}"
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{url}/missing.html")
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+    assert not any(tmp_path.joinpath("output").iterdir())
+
+
+def test_on_demand_renderer_leaves_output_path_untouched(tmp_path):
+    """Tests that the pre-build plugins (like `CleanOutput`) don't run when pages are rendered on demand"""
+    site = _site(tmp_path)
+    site.register_plugins(CleanOutput)
+    tmp_path.joinpath("output", "index.html").write_text("built")
+    renderer = OnDemandRenderer(site)
+
+    renderer.render("/about.html")
+    renderer.reload({str(tmp_path / "about.md")})
+    assert [path.name for path in tmp_path.joinpath("output").iterdir()] == ["index.html"]